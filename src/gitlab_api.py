@@ -1,67 +1,401 @@
 #!/usr/bin/env python3
 
+import os
 import time
+import random
 import logging
-from typing import Optional, Dict, List, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Callable
+import ijson
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+MAX_CONCURRENT_REQUESTS = 16
+CONNECTION_POOL_SIZE = 64
+
+RATE_LIMIT_BUDGET = 0.7
+
+PAGE_SIZE = 100
+
+MERGE_STATUS_PENDING = ('checking', 'unchecked', 'preparing', 'approvals_syncing')
+PIPELINE_TERMINAL = ('success', 'failed', 'canceled', 'skipped')
+MR_RESULT_MAX_AGE = 300
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+RETRYABLE_ERRORS = (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError)
+
+CACHE_TTL_STATIC = 3600
+CACHE_TTL_STATUS = 10
+CACHE_TTL_DETAIL = 1
+CACHE_MAX_ENTRIES = 2048
+
+GRAPHQL_URL = 'https://gitlab.com/api/graphql'
+USE_GRAPHQL = os.environ.get('MR_STATUS_USE_GRAPHQL', '') == '1'
+
+MR_BUNDLE_FIELDS = '''
+    iid
+    approved
+    approvalState { rules { name approved } }
+    approvedBy { nodes { name username } }
+    mergeStatusEnum
+    detailedMergeStatus
+    conflicts
+    headPipeline { id status path }
+    discussions(first: 100) { nodes { resolvable resolved } }
+    assignees { nodes { name username publicEmail } }
+    reviewers { nodes { name username publicEmail } }
+'''
+
+_cache: OrderedDict[tuple[str, Optional[frozenset]], tuple[float, Optional[str], Any]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+_rate_state: Dict[str, Any] = {'remaining': None, 'reset_at': 0.0, 'requests': 0}
+_rate_lock = threading.Lock()
+
+_poll_cycle_id: Optional[int] = None
+_mr_detail_cycle: Dict[tuple[str, int], Future] = {}
+_mr_detail_lock = threading.Lock()
+
+_mr_results: Dict[tuple[str, int], tuple[float, str, str, Dict[str, Any]]] = {}
+_mr_results_lock = threading.Lock()
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
 # ##################################################################
-# gitlab request with retry
-# wraps gitlab api calls with exponential backoff for rate limiting
-# and transient failures to ensure reliable data retrieval
-def make_gitlab_request(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None,
-                        max_retries: int = 3, base_delay: int = 1) -> Optional[Any]:
+# get session
+# returns the shared http session, creating it on first use so all
+# requests to gitlab reuse pooled keep-alive connections
+def _get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=CONNECTION_POOL_SIZE))
+            _session = session
+        return _session
+
+# ##################################################################
+# close session
+# releases the pooled connections of the shared session so the next
+# request in this process starts a fresh one
+def close_session() -> None:
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+# ##################################################################
+# get executor
+# returns the shared pool for per-mr lookups, creating it on first use so
+# its threads are reused across repos and poll cycles
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS,
+                                           thread_name_prefix='gitlab')
+        return _executor
+
+# ##################################################################
+# shutdown executor
+# stops the shared lookup pool once no more refreshes will be issued
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+# ##################################################################
+# record rate limit
+# counts a request and tracks the rate limit headers gitlab returned
+def _record_rate_limit(response: requests.Response) -> None:
+    remaining = response.headers.get('RateLimit-Remaining')
+    reset_at = response.headers.get('RateLimit-Reset')
+    with _rate_lock:
+        _rate_state['requests'] += 1
+        if remaining and remaining.isdigit():
+            _rate_state['remaining'] = int(remaining)
+        if reset_at and reset_at.isdigit():
+            _rate_state['reset_at'] = float(reset_at)
+
+# ##################################################################
+# request count
+# returns how many gitlab requests this process has issued so far
+def request_count() -> int:
+    with _rate_lock:
+        return _rate_state['requests']
+
+# ##################################################################
+# suggested delay
+# returns how many seconds a poll cycle of the given request count should
+# take so the remaining rate limit budget lasts until the window resets
+# with headroom to spare, or zero when gitlab sent no rate limit headers
+# never longer than the time to the reset, when the quota refills anyway
+def suggested_delay(requests_per_cycle: int = 1) -> float:
+    with _rate_lock:
+        remaining = _rate_state['remaining']
+        reset_at = _rate_state['reset_at']
+    if remaining is None:
+        return 0.0
+
+    window = max(0.0, reset_at - time.time())
+    return min(window, window / max(1, remaining) * requests_per_cycle / RATE_LIMIT_BUDGET)
+
+# ##################################################################
+# cache key
+# builds a hashable key from url and query parameters
+def _cache_key(url: str, params: Optional[Dict[str, Any]]) -> tuple[str, Optional[frozenset]]:
+    return url, frozenset(params.items()) if params else None
+
+# ##################################################################
+# cache store
+# records a response in the cache as most recently used, evicting the
+# least recently used entries beyond the size cap
+def _cache_store(key: tuple[str, Optional[frozenset]], entry: tuple[float, Optional[str], Any]) -> None:
+    with _cache_lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+# ##################################################################
+# invalidate
+# drops cached responses for the given url and any path or query below
+# it so data changed by a write is refetched on the next read, without
+# touching siblings such as merge request 10 when invalidating 1
+def invalidate(url_prefix: str) -> None:
+    with _cache_lock:
+        for key in [key for key in _cache if _url_under(key[0], url_prefix)]:
+            del _cache[key]
+
+# ##################################################################
+# url under
+# reports whether a url is the prefix itself or a path or query below it
+def _url_under(url: str, url_prefix: str) -> bool:
+    return url == url_prefix or url.startswith(url_prefix + '/') or url.startswith(url_prefix + '?')
+
+# ##################################################################
+# request with retry
+# issues a gitlab get with jittered exponential backoff for rate limiting,
+# server errors and connection failures, honouring retry-after when sent
+# returns the response for 200 and 304 replies and gives up immediately
+# on other client errors since retrying them cannot succeed
+def _request_with_retry(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None,
+                        max_retries: int = 3, base_delay: int = 1,
+                        stream: bool = False) -> Optional[requests.Response]:
     for attempt in range(max_retries):
+        delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 429:
-                delay = base_delay * (2 ** attempt) + 5
-                logger.warning(f"rate limited url={url} retry={attempt+1}/{max_retries} delay={delay}s")
-                time.sleep(delay)
-            else:
-                logger.error(f"request failed url={url} status={response.status_code}")
-                return None
-        except requests.exceptions.Timeout:
-            delay = base_delay * (2 ** attempt)
-            logger.warning(f"timeout url={url} retry={attempt+1}/{max_retries} delay={delay}s")
-            if attempt < max_retries - 1:
-                time.sleep(delay)
+            response = _get_session().get(url, headers=headers, params=params, timeout=30, stream=stream)
+            _record_rate_limit(response)
+        except RETRYABLE_ERRORS as err:
+            logger.warning(f"transient error url={url} retry={attempt+1}/{max_retries} delay={delay:.1f}s err={err}")
         except Exception as err:
             logger.error(f"request error url={url} err={err}")
-            if attempt < max_retries - 1:
-                time.sleep(base_delay)
+            return None
+        else:
+            if response.status_code in (200, 304):
+                return response
+
+            response.close()
+            if response.status_code not in RETRYABLE_STATUSES:
+                logger.error(f"request failed url={url} status={response.status_code}")
+                return None
+
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                delay = int(retry_after)
+            logger.warning(f"retryable status url={url} status={response.status_code} "
+                           f"retry={attempt+1}/{max_retries} delay={delay:.1f}s")
+
+        if attempt < max_retries - 1:
+            time.sleep(delay)
     return None
 
+# ##################################################################
+# gitlab request with retry
+# wraps gitlab api calls with retry and returns the decoded json, serving
+# repeated reads from an in-memory cache for up to ttl seconds and
+# revalidating older entries with their etag to skip unchanged bodies
+# an optional parser consumes the streamed response instead of json
+# decoding, and its result is what gets cached
+def make_gitlab_request(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None,
+                        max_retries: int = 3, base_delay: int = 1, ttl: float = 0,
+                        parser: Optional[Callable[[requests.Response], Any]] = None) -> Optional[Any]:
+    key = _cache_key(url, params)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+    if ttl > 0 and cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[2]
+
+    request_headers = headers
+    if cached is not None and cached[1]:
+        request_headers = {'If-None-Match': cached[1], **headers}
+
+    response = _request_with_retry(url, request_headers, params, max_retries, base_delay,
+                                   stream=parser is not None)
+    if response is None:
+        return None
+
+    if response.status_code == 304:
+        response.close()
+        if cached is None:
+            return None
+        _cache_store(key, (time.monotonic(), cached[1], cached[2]))
+        return cached[2]
+
+    if parser is not None:
+        with response:
+            result = parser(response)
+    else:
+        result = orjson.loads(response.content)
+    etag = response.headers.get('ETag')
+    if ttl > 0 or etag:
+        _cache_store(key, (time.monotonic(), etag, result))
+    return result
+
+# ##################################################################
+# get all user merge requests
+# retrieves every open merge request authored by the token owner across
+# all projects in one paginated listing
+# returns none on failure so callers can fall back to per-project listing
+def get_all_user_merge_requests(token: str) -> Optional[List[Dict[str, Any]]]:
+    headers = {'PRIVATE-TOKEN': token}
+    params = {
+        'scope': 'created_by_me',
+        'state': 'opened',
+        'per_page': PAGE_SIZE
+    }
+    return _get_paginated('https://gitlab.com/api/v4/merge_requests', headers, params)
+
+# ##################################################################
+# get paginated
+# collects every item of a listing by following the link header,
+# revalidating each page with its etag so unchanged pages cost no body
+# stops early on a short page since nothing can follow it
+def _get_paginated(url: str, headers: Dict[str, str],
+                   params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    per_page = params.get('per_page', PAGE_SIZE)
+    page_url: Optional[str] = url
+    page_params: Optional[Dict[str, Any]] = params
+
+    items: List[Dict[str, Any]] = []
+    while page_url:
+        page = make_gitlab_request(page_url, headers, page_params, parser=_parse_page)
+        if page is None:
+            return None
+        page_items, page_url = page
+        items.extend(page_items)
+        if len(page_items) < per_page:
+            break
+        page_params = None
+
+    return items
+
+# ##################################################################
+# parse page
+# decodes one page of a paginated listing together with the link to the
+# next page so both can be served from the etag cache on a 304
+def _parse_page(response: requests.Response) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    return orjson.loads(response.content), response.links.get('next', {}).get('url')
+
+# ##################################################################
+# start poll cycle
+# begins a new poll cycle, discarding mr details fetched in the last one
+# so each mr detail is fetched at most once per cycle
+def start_poll_cycle() -> None:
+    global _poll_cycle_id
+    with _mr_detail_lock:
+        _poll_cycle_id = (_poll_cycle_id or 0) + 1
+        _mr_detail_cycle.clear()
+
+# ##################################################################
+# end poll cycle
+# closes the current poll cycle so lookups made between cycles, such as
+# the notifier's, fetch fresh details instead of the finished cycle's
+def end_poll_cycle() -> None:
+    global _poll_cycle_id
+    with _mr_detail_lock:
+        _poll_cycle_id = None
+        _mr_detail_cycle.clear()
+
+# ##################################################################
+# fetch merge request detail
+# retrieves the full mr object, shared by every lookup for that mr within
+# the current poll cycle so concurrent callers wait on a single request
+# any thread reading while a cycle is open shares it, the notifier included;
+# between cycles reads fall back to the short detail ttl
+def fetch_mr_detail(project_id: str, mr_iid: int, token: str) -> Optional[Dict[str, Any]]:
+    headers = {'PRIVATE-TOKEN': token}
+    url = f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}'
+
+    with _mr_detail_lock:
+        if _poll_cycle_id is None:
+            future = None
+            is_owner = True
+        else:
+            future = _mr_detail_cycle.get((project_id, mr_iid))
+            is_owner = future is None
+            if is_owner:
+                future = _mr_detail_cycle[(project_id, mr_iid)] = Future()
+
+    if future is None:
+        return make_gitlab_request(url, headers, ttl=CACHE_TTL_DETAIL)
+
+    if is_owner:
+        try:
+            future.set_result(make_gitlab_request(url, headers, ttl=CACHE_TTL_DETAIL))
+        except Exception as err:
+            future.set_exception(err)
+    return future.result()
+
 # ##################################################################
 # get merge requests
 # retrieves all open merge requests for a specific user and project
 # from gitlab api with pagination support
-def get_merge_requests(project_id: str, user_id: str, token: str) -> List[Dict[str, Any]]:
+def get_merge_requests(project_id: str, user_id: str, token: str,
+                       per_page: int = PAGE_SIZE) -> List[Dict[str, Any]]:
     headers = {'PRIVATE-TOKEN': token}
     params = {
         'state': 'opened',
         'author_id': user_id,
-        'per_page': 50
+        'per_page': per_page
     }
-    result = make_gitlab_request(f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests',
-                                 headers, params)
+    result = _get_paginated(f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests',
+                            headers, params)
     return result if result is not None else []
 
 # ##################################################################
 # get pipeline status
 # determines the current pipeline state for a merge request by sha
 # returns tuple of status, url, and debug information for diagnostics
-def get_pipeline_status(project_id: str, mr_sha: str, token: str,
-                       mr_iid: Optional[int] = None) -> tuple[Optional[str], Optional[str], Dict[str, Any]]:
+def get_pipeline_status(project_id: str, mr_sha: str, token: str, mr_iid: Optional[int] = None,
+                        mr_data: Optional[Dict[str, Any]] = None) -> tuple[Optional[str], Optional[str], Dict[str, Any]]:
+    if USE_GRAPHQL and mr_iid:
+        bundle = fetch_mr_bundle(project_id, mr_iid, token)
+        if bundle is not None:
+            return _bundle_pipeline_status(bundle)
+
     debug_info = {}
     headers = {'PRIVATE-TOKEN': token}
 
     pipelines_data = make_gitlab_request(f'https://gitlab.com/api/v4/projects/{project_id}/pipelines',
-                                        headers, {'sha': mr_sha})
+                                        headers, {'sha': mr_sha}, ttl=CACHE_TTL_STATUS)
 
     if pipelines_data is not None:
         debug_info['pipelines_count'] = len(pipelines_data)
@@ -75,8 +409,8 @@ def get_pipeline_status(project_id: str, mr_sha: str, token: str,
             debug_info['pipelines_empty'] = True
 
     if mr_iid:
-        mr_data = make_gitlab_request(f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}',
-                                     headers)
+        if mr_data is None:
+            mr_data = fetch_mr_detail(project_id, mr_iid, token)
 
         if mr_data is not None:
             debug_info['mr_head_sha'] = mr_data.get('sha')
@@ -86,7 +420,7 @@ def get_pipeline_status(project_id: str, mr_sha: str, token: str,
                 pipeline_id = mr_data['head_pipeline']['id']
                 pipeline_data = make_gitlab_request(
                     f'https://gitlab.com/api/v4/projects/{project_id}/pipelines/{pipeline_id}',
-                    headers)
+                    headers, ttl=CACHE_TTL_STATUS)
 
                 if pipeline_data is not None:
                     debug_info['head_pipeline_status'] = pipeline_data['status']
@@ -102,32 +436,19 @@ def get_pipeline_status(project_id: str, mr_sha: str, token: str,
 # checks approval state including special handling for coverage check
 # returns dict with approval flags and coverage requirement status
 def get_approval_status(project_id: str, mr_iid: int, token: str) -> Dict[str, bool]:
+    if USE_GRAPHQL:
+        bundle = fetch_mr_bundle(project_id, mr_iid, token)
+        if bundle is not None:
+            return _bundle_approval_status(bundle)
+
     headers = {'PRIVATE-TOKEN': token}
     approvals_data = make_gitlab_request(
         f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}/approvals',
-        headers)
+        headers, ttl=CACHE_TTL_STATUS)
 
     if approvals_data is not None:
-        approval_rules = approvals_data.get('approval_rules_left', [])
-
-        needs_coverage_check = False
-        needs_other_approval = False
-
-        for rule in approval_rules:
-            rule_name = rule.get('name', '')
-            if rule_name == 'Coverage-Check':
-                needs_coverage_check = True
-            else:
-                needs_other_approval = True
-
-        approved_by_all = approvals_data.get('approved', False)
-        approved_except_coverage = (not needs_other_approval) and (not approved_by_all or needs_coverage_check)
-
-        return {
-            'approved_by_all': approved_by_all,
-            'approved_except_coverage': approved_except_coverage,
-            'needs_coverage_check': needs_coverage_check
-        }
+        return _summarize_approvals(approvals_data.get('approval_rules_left', []),
+                                    approvals_data.get('approved', False))
 
     return {
         'approved_by_all': False,
@@ -135,47 +456,398 @@ def get_approval_status(project_id: str, mr_iid: int, token: str) -> Dict[str, b
         'needs_coverage_check': False
     }
 
+# ##################################################################
+# summarize approvals
+# derives approval flags from the rules still awaiting approval,
+# treating the coverage check rule separately from human reviews
+def _summarize_approvals(approval_rules_left: List[Dict[str, Any]], approved_by_all: bool) -> Dict[str, bool]:
+    needs_coverage_check = False
+    needs_other_approval = False
+
+    for rule in approval_rules_left:
+        rule_name = rule.get('name', '')
+        if rule_name == 'Coverage-Check':
+            needs_coverage_check = True
+        else:
+            needs_other_approval = True
+
+    approved_except_coverage = (not needs_other_approval) and (not approved_by_all or needs_coverage_check)
+
+    return {
+        'approved_by_all': approved_by_all,
+        'approved_except_coverage': approved_except_coverage,
+        'needs_coverage_check': needs_coverage_check
+    }
+
 # ##################################################################
 # get merge status
 # determines if merge request has conflicts that block merging
 # returns conflict indicator or empty string for clean merges
-def get_merge_status(project_id: str, mr_iid: int, token: str) -> str:
-    headers = {'PRIVATE-TOKEN': token}
-    params = {'with_merge_status_recheck': 'true'}
-    mr_data = make_gitlab_request(f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}',
-                                 headers, params)
+# when the listed mr is supplied and gitlab has settled its mergeability
+# the listing's status is used without any request; a pending or missing
+# status is always fetched, requesting a server side recheck while gitlab
+# is still checking, since a push to the target branch resets it
+def get_merge_status(project_id: str, mr_iid: int, token: str,
+                     listed_mr: Optional[Dict[str, Any]] = None,
+                     mr_data: Optional[Dict[str, Any]] = None) -> str:
+    if USE_GRAPHQL:
+        bundle = fetch_mr_bundle(project_id, mr_iid, token)
+        if bundle is not None:
+            return _bundle_merge_status(bundle)
+
+    if listed_mr:
+        listed_status = _merge_status_from(listed_mr)
+        if listed_status is not None:
+            return listed_status
+
+    if mr_data is None:
+        mr_data = fetch_mr_detail(project_id, mr_iid, token)
+
+    if mr_data is not None and mr_data.get('detailed_merge_status') in MERGE_STATUS_PENDING:
+        mr_data = make_gitlab_request(f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}',
+                                      {'PRIVATE-TOKEN': token}, {'with_merge_status_recheck': 'true'},
+                                      ttl=CACHE_TTL_DETAIL)
 
     if mr_data is not None:
-        merge_status = mr_data.get('merge_status')
-        detailed_merge_status = mr_data.get('detailed_merge_status')
-        has_conflicts = mr_data.get('has_conflicts', False)
-
-        if (detailed_merge_status == 'conflict' or
-            merge_status == 'cannot_be_merged' or
-            has_conflicts):
-            return 'CONFLICT'
-        else:
-            return ''
+        return _merge_status_from(mr_data) or ''
 
     return ''
 
+# ##################################################################
+# merge status from
+# reads the conflict indicator from mr data, returning none while gitlab
+# has not finished checking mergeability
+def _merge_status_from(mr_data: Dict[str, Any]) -> Optional[str]:
+    detailed_merge_status = mr_data.get('detailed_merge_status')
+
+    if (detailed_merge_status == 'conflict' or
+        mr_data.get('merge_status') == 'cannot_be_merged' or
+        mr_data.get('has_conflicts', False)):
+        return 'CONFLICT'
+    elif detailed_merge_status is None or detailed_merge_status in MERGE_STATUS_PENDING:
+        return None
+    else:
+        return ''
+
 # ##################################################################
 # get unresolved threads count
 # counts discussion threads that remain unresolved on merge request
 # used to indicate outstanding review comments requiring attention
 def get_unresolved_threads_count(project_id: str, mr_iid: int, token: str) -> int:
+    if USE_GRAPHQL:
+        bundle = fetch_mr_bundle(project_id, mr_iid, token)
+        if bundle is not None:
+            return _bundle_unresolved_threads(bundle)
+
     headers = {'PRIVATE-TOKEN': token}
-    discussions_data = make_gitlab_request(
-        f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}/discussions',
-        headers)
+    url: Optional[str] = f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}/discussions'
+    params: Optional[Dict[str, Any]] = {'per_page': PAGE_SIZE}
+
+    unresolved_count = 0
+    while url:
+        page = make_gitlab_request(url, headers, params, ttl=CACHE_TTL_STATUS, parser=_count_unresolved_threads)
+        if page is None:
+            break
+        page_unresolved, discussion_count, url = page
+        unresolved_count += page_unresolved
+        if discussion_count < PAGE_SIZE:
+            break
+        params = None
+
+    return unresolved_count
+
+# ##################################################################
+# count unresolved threads
+# stream parses one page of discussions and counts those whose first
+# note is unresolved without building the discussion objects in memory
+# returns the count, the discussions on the page, and the next page link
+def _count_unresolved_threads(response: requests.Response) -> tuple[int, int, Optional[str]]:
+    response.raw.decode_content = True
+    unresolved_count = 0
+    discussion_count = 0
+    note_index = 0
+    for prefix, event, value in ijson.parse(response.raw):
+        if prefix == 'item' and event == 'start_map':
+            discussion_count += 1
+        elif prefix == 'item.notes' and event == 'start_array':
+            note_index = 0
+        elif prefix == 'item.notes.item' and event == 'start_map':
+            note_index += 1
+        elif prefix == 'item.notes.item.resolved' and note_index == 1 and not value:
+            unresolved_count += 1
+    return unresolved_count, discussion_count, response.links.get('next', {}).get('url')
+
+# ##################################################################
+# graphql request
+# posts a query to the gitlab graphql endpoint and returns its data
+# section, or none when the request or any part of the query failed
+def _graphql_request(query: str, variables: Dict[str, Any], token: str) -> Optional[Dict[str, Any]]:
+    try:
+        response = _get_session().post(GRAPHQL_URL,
+                                       headers={'Authorization': f'Bearer {token}'},
+                                       json={'query': query, 'variables': variables},
+                                       timeout=30)
+        _record_rate_limit(response)
+    except Exception as err:
+        logger.error(f"graphql request error err={err}")
+        return None
+
+    if response.status_code != 200:
+        logger.error(f"graphql request failed status={response.status_code}")
+        return None
+
+    payload = orjson.loads(response.content)
+    if payload.get('errors'):
+        logger.error(f"graphql errors={payload['errors']}")
+        return None
+    return payload.get('data')
+
+# ##################################################################
+# fetch merge request bundles
+# retrieves pipeline, approval, merge, discussion and reviewer state for
+# several mrs of one project in a single graphql query using aliases
+def fetch_mr_bundles(project_id: str, mr_iids: List[int], token: str) -> Dict[int, Dict[str, Any]]:
+    bundles = {}
+    missing = []
+    with _cache_lock:
+        for mr_iid in mr_iids:
+            cached = _cache.get(_cache_key(GRAPHQL_URL, {'project_id': project_id, 'iid': mr_iid}))
+            if cached is not None and time.monotonic() - cached[0] < CACHE_TTL_DETAIL:
+                bundles[mr_iid] = cached[2]
+            else:
+                missing.append(mr_iid)
+
+    if not missing:
+        return bundles
+
+    aliases = '\n'.join(f'mr_{mr_iid}: mergeRequest(iid: "{mr_iid}") {{ {MR_BUNDLE_FIELDS} }}'
+                        for mr_iid in missing)
+    query = f'query($ids: [ID!]) {{ projects(ids: $ids) {{ nodes {{ {aliases} }} }} }}'
+    data = _graphql_request(query, {'ids': [f'gid://gitlab/Project/{project_id}']}, token)
+    if data is None:
+        return bundles
+
+    nodes = data.get('projects', {}).get('nodes', [])
+    if not nodes:
+        logger.error(f"graphql project not found project_id={project_id}")
+        return bundles
+
+    now = time.monotonic()
+    for mr_iid in missing:
+        bundle = nodes[0].get(f'mr_{mr_iid}')
+        if bundle is not None:
+            bundles[mr_iid] = bundle
+            _cache_store(_cache_key(GRAPHQL_URL, {'project_id': project_id, 'iid': mr_iid}), (now, None, bundle))
+
+    return bundles
+
+# ##################################################################
+# fetch merge request bundle
+# retrieves the combined graphql status bundle for a single mr
+def fetch_mr_bundle(project_id: str, mr_iid: int, token: str) -> Optional[Dict[str, Any]]:
+    return fetch_mr_bundles(project_id, [mr_iid], token).get(mr_iid)
+
+# ##################################################################
+# get all merge request data graphql
+# retrieves every open mr authored by the token owner together with its
+# pipeline, approval, merge and discussion state in one paginated graphql
+# query, replacing both the rest listing and the per-mr lookups
+# returns status dicts grouped by project id, or none on failure so
+# callers can fall back to the rest path
+def get_all_mr_data_graphql(token: str) -> Optional[Dict[int, List[Dict[str, Any]]]]:
+    query = (f'query($after: String) {{ currentUser {{ authoredMergeRequests(state: opened, first: 50, after: $after) '
+             f'{{ pageInfo {{ hasNextPage endCursor }} nodes {{ projectId title webUrl sourceBranch diffHeadSha '
+             f'{MR_BUNDLE_FIELDS} }} }} }} }}')
+
+    results: Dict[int, List[Dict[str, Any]]] = {}
+    after = None
+    while True:
+        data = _graphql_request(query, {'after': after}, token)
+        if data is None or not data.get('currentUser'):
+            return None
+
+        connection = data['currentUser']['authoredMergeRequests']
+        for node in connection['nodes']:
+            mr = {
+                'iid': int(node['iid']),
+                'project_id': node['projectId'],
+                'title': node['title'],
+                'web_url': node['webUrl'],
+                'source_branch': node['sourceBranch'],
+                'sha': node['diffHeadSha']
+            }
+            results.setdefault(mr['project_id'], []).append(_bundle_mr_results(mr, node))
+
+        if not connection['pageInfo']['hasNextPage']:
+            return results
+        after = connection['pageInfo']['endCursor']
+
+# ##################################################################
+# bundle pipeline status
+# extracts head pipeline status and url in the rest getter's shape
+def _bundle_pipeline_status(bundle: Dict[str, Any]) -> tuple[Optional[str], Optional[str], Dict[str, Any]]:
+    pipeline = bundle.get('headPipeline')
+    if not pipeline:
+        return None, None, {'no_head_pipeline': True}
+
+    status = pipeline['status'].lower()
+    return status, f"https://gitlab.com{pipeline['path']}", {'head_pipeline_status': status}
+
+# ##################################################################
+# bundle approval status
+# derives approval flags from the graphql approval rules
+def _bundle_approval_status(bundle: Dict[str, Any]) -> Dict[str, bool]:
+    rules = (bundle.get('approvalState') or {}).get('rules') or []
+    return _summarize_approvals([rule for rule in rules if not rule.get('approved')],
+                                bool(bundle.get('approved')))
+
+# ##################################################################
+# bundle merge status
+# maps graphql merge state onto the rest getter's conflict indicator
+def _bundle_merge_status(bundle: Dict[str, Any]) -> str:
+    if (bundle.get('detailedMergeStatus') == 'CONFLICT' or
+        bundle.get('mergeStatusEnum') == 'CANNOT_BE_MERGED' or
+        bundle.get('conflicts')):
+        return 'CONFLICT'
+    return ''
+
+# ##################################################################
+# bundle unresolved threads
+# counts resolvable discussions that are not yet resolved
+def _bundle_unresolved_threads(bundle: Dict[str, Any]) -> int:
+    discussions = (bundle.get('discussions') or {}).get('nodes') or []
+    return sum(1 for discussion in discussions if discussion.get('resolvable') and not discussion.get('resolved'))
+
+# ##################################################################
+# bundle assignees and approvals
+# collects assignee and reviewer names plus the names of approvers
+# and the public emails of assignees that publish one
+def _bundle_assignees_and_approvals(bundle: Dict[str, Any]) -> tuple[List[str], List[str], Dict[str, str]]:
+    seen: set[str] = set()
+    assignees: List[str] = []
+    emails: Dict[str, str] = {}
+    for field in ('assignees', 'reviewers'):
+        for user in (bundle.get(field) or {}).get('nodes') or []:
+            name = user.get('name') or user.get('username') or 'Unknown'
+            if name not in seen:
+                seen.add(name)
+                assignees.append(name)
+                if user.get('publicEmail'):
+                    emails[name] = user['publicEmail']
+
+    approved_users = [user.get('name') or user.get('username') or 'Unknown'
+                      for user in (bundle.get('approvedBy') or {}).get('nodes') or []]
+    return assignees, approved_users, emails
+
+# ##################################################################
+# bundle merge request results
+# assembles the per-mr status dict from a graphql bundle
+def _bundle_mr_results(mr: Dict[str, Any], bundle: Dict[str, Any]) -> Dict[str, Any]:
+    pipeline_status, pipeline_url, debug_info = _bundle_pipeline_status(bundle)
+    return {
+        'mr': mr,
+        'pipeline_status': pipeline_status,
+        'pipeline_url': pipeline_url,
+        'approval_status': _bundle_approval_status(bundle),
+        'merge_status': _bundle_merge_status(bundle),
+        'unresolved_threads': _bundle_unresolved_threads(bundle),
+        'debug_info': debug_info
+    }
+
+# ##################################################################
+# submit merge request requests
+# schedules the independent per-mr status lookups on the executor
+# so they run concurrently instead of as sequential round trips
+def _submit_mr_requests(executor: ThreadPoolExecutor, project_id: str, mr: Dict[str, Any],
+                        token: str) -> Dict[str, Future]:
+    return {
+        'pipeline': executor.submit(get_pipeline_status, project_id, mr['sha'], token, mr['iid']),
+        'approval_status': executor.submit(get_approval_status, project_id, mr['iid'], token),
+        'merge_status': executor.submit(get_merge_status, project_id, mr['iid'], token, mr),
+        'unresolved_threads': executor.submit(get_unresolved_threads_count, project_id, mr['iid'], token)
+    }
+
+# ##################################################################
+# collect merge request results
+# waits for the scheduled lookups of one mr and assembles its status dict
+def _collect_mr_results(mr: Dict[str, Any], futures: Dict[str, Future]) -> Dict[str, Any]:
+    pipeline_status, pipeline_url, debug_info = futures['pipeline'].result()
+    return {
+        'mr': mr,
+        'pipeline_status': pipeline_status,
+        'pipeline_url': pipeline_url,
+        'approval_status': futures['approval_status'].result(),
+        'merge_status': futures['merge_status'].result(),
+        'unresolved_threads': futures['unresolved_threads'].result(),
+        'debug_info': debug_info
+    }
+
+# ##################################################################
+# reusable result
+# returns the last status of an mr when it has not been updated, its
+# head sha is unchanged, its pipeline had finished and the result is
+# recent enough to trust for changes gitlab does not reflect in updated_at
+def _reusable_result(project_id: str, mr: Dict[str, Any], now: float) -> Optional[Dict[str, Any]]:
+    with _mr_results_lock:
+        cached = _mr_results.get((project_id, mr['iid']))
+    if cached is None or not mr.get('updated_at'):
+        return None
+
+    fetched_at, updated_at, sha, result = cached
+    if now - fetched_at >= MR_RESULT_MAX_AGE or updated_at != mr['updated_at'] or sha != mr.get('sha'):
+        return None
+    return {**result, 'mr': mr}
+
+# ##################################################################
+# remember results
+# records freshly fetched statuses whose pipeline has finished so the
+# next cycle can skip them while the mr stays unchanged
+def _remember_results(project_id: str, results: List[Dict[str, Any]], now: float) -> None:
+    with _mr_results_lock:
+        for result in results:
+            mr = result['mr']
+            if result['pipeline_status'] in PIPELINE_TERMINAL and mr.get('updated_at'):
+                _mr_results[(project_id, mr['iid'])] = (now, mr['updated_at'], mr.get('sha'), result)
+            else:
+                _mr_results.pop((project_id, mr['iid']), None)
+
+# ##################################################################
+# forget missing
+# drops the remembered results of a project's mrs that are no longer
+# in its listing, so merged and closed mrs do not linger
+def _forget_missing(project_id: str, mrs: List[Dict[str, Any]]) -> None:
+    listed = {(project_id, mr['iid']) for mr in mrs}
+    with _mr_results_lock:
+        for key in [key for key in _mr_results if key[0] == project_id and key not in listed]:
+            del _mr_results[key]
 
-    if discussions_data is not None:
-        unresolved_count = 0
-        for discussion in discussions_data:
-            if discussion.get('notes') and not discussion.get('notes', [{}])[0].get('resolved', True):
-                unresolved_count += 1
-        return unresolved_count
-    return 0
+# ##################################################################
+# refresh all
+# fetches status for every mr of a project in one concurrent fan out on
+# the shared pool bounded by max concurrent requests, preserving the input order
+# mrs unchanged since a finished pipeline reuse their last status, and
+# when graphql is enabled the rest are batched into a single query with
+# only mrs missing from its response falling back to the rest fan out
+def refresh_all(project_id: str, mrs: List[Dict[str, Any]], token: str) -> List[Dict[str, Any]]:
+    _forget_missing(project_id, mrs)
+    if not mrs:
+        return []
+
+    now = time.monotonic()
+    reused = {mr['iid']: result for mr in mrs if (result := _reusable_result(project_id, mr, now)) is not None}
+    stale = [mr for mr in mrs if mr['iid'] not in reused]
+
+    bundles = fetch_mr_bundles(project_id, [mr['iid'] for mr in stale], token) if USE_GRAPHQL and stale else {}
+
+    executor = _get_executor()
+    pending = [(mr, None if mr['iid'] in bundles else _submit_mr_requests(executor, project_id, mr, token))
+               for mr in stale]
+    fetched = {mr['iid']: _bundle_mr_results(mr, bundles[mr['iid']]) if futures is None
+               else _collect_mr_results(mr, futures)
+               for mr, futures in pending}
+    _remember_results(project_id, list(fetched.values()), now)
+
+    return [reused[mr['iid']] if mr['iid'] in reused else fetched[mr['iid']] for mr in mrs]
 
 # ##################################################################
 # get current user
@@ -183,7 +855,7 @@ def get_unresolved_threads_count(project_id: str, mr_iid: int, token: str) -> in
 # used to filter merge requests by author
 def get_current_user(token: str) -> Optional[Dict[str, Any]]:
     headers = {'PRIVATE-TOKEN': token}
-    return make_gitlab_request('https://gitlab.com/api/v4/user', headers)
+    return make_gitlab_request('https://gitlab.com/api/v4/user', headers, ttl=CACHE_TTL_STATIC)
 
 # ##################################################################
 # get project id
@@ -193,7 +865,8 @@ def get_project_id(owner: str, repo: str, token: str) -> Optional[int]:
     from urllib.parse import quote
     headers = {'PRIVATE-TOKEN': token}
     project_path = quote(f"{owner}/{repo}", safe='')
-    project_data = make_gitlab_request(f'https://gitlab.com/api/v4/projects/{project_path}', headers)
+    project_data = make_gitlab_request(f'https://gitlab.com/api/v4/projects/{project_path}', headers,
+                                       ttl=CACHE_TTL_STATIC)
 
     if project_data is not None:
         return project_data['id']
@@ -203,43 +876,47 @@ def get_project_id(owner: str, repo: str, token: str) -> Optional[int]:
 # get merge request assignees and approvals
 # retrieves both assigned reviewers and users who have already approved
 # returns tuple of assignee names and approved user names for filtering
-def get_mr_assignees_and_approvals(project_id: str, mr_iid: int, token: str) -> tuple[List[str], List[str]]:
-    headers = {'PRIVATE-TOKEN': token}
-
-    mr_response = requests.get(
-        f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}',
-        headers=headers)
-
-    if mr_response.status_code != 200:
-        logger.error(f"failed to get mr data project_id={project_id} mr_iid={mr_iid} status={mr_response.status_code}")
-        return [], []
-
-    mr_data = mr_response.json()
-    assignees = []
+# plus a name to email map for assignees whose public email is known,
+# looked up per user since rest mr payloads only carry basic user objects
+def get_mr_assignees_and_approvals(project_id: str, mr_iid: int, token: str,
+                                   mr_data: Optional[Dict[str, Any]] = None
+                                   ) -> tuple[List[str], List[str], Dict[str, str]]:
+    if USE_GRAPHQL:
+        bundle = fetch_mr_bundle(project_id, mr_iid, token)
+        if bundle is not None:
+            return _bundle_assignees_and_approvals(bundle)
+
+    if mr_data is None:
+        mr_data = fetch_mr_detail(project_id, mr_iid, token)
+
+    if mr_data is None:
+        logger.error(f"failed to get mr data project_id={project_id} mr_iid={mr_iid}")
+        return [], [], {}
+
+    seen: set[str] = set()
+    assignees: List[str] = []
+    emails: Dict[str, str] = {}
+
+    users = list(mr_data.get('assignees') or [])
+    if mr_data.get('assignee'):
+        users.append(mr_data['assignee'])
+    users.extend(mr_data.get('reviewers') or [])
+
+    for user in users:
+        name = user.get('name', user.get('username', 'Unknown'))
+        if name not in seen:
+            seen.add(name)
+            assignees.append(name)
+            email = user.get('public_email') or (get_user_public_email(user['id'], token) if user.get('id') else None)
+            if email:
+                emails[name] = email
 
-    if 'assignees' in mr_data and mr_data['assignees']:
-        for assignee in mr_data['assignees']:
-            assignees.append(assignee.get('name', assignee.get('username', 'Unknown')))
-
-    if 'assignee' in mr_data and mr_data['assignee']:
-        assignee_name = mr_data['assignee'].get('name', mr_data['assignee'].get('username', 'Unknown'))
-        if assignee_name not in assignees:
-            assignees.append(assignee_name)
-
-    if 'reviewers' in mr_data and mr_data['reviewers']:
-        for reviewer in mr_data['reviewers']:
-            reviewer_name = reviewer.get('name', reviewer.get('username', 'Unknown'))
-            if reviewer_name not in assignees:
-                assignees.append(reviewer_name)
-
-    approvals_response = requests.get(
+    approvals_data = make_gitlab_request(
         f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}/approvals',
-        headers=headers)
+        {'PRIVATE-TOKEN': token}, ttl=CACHE_TTL_STATUS)
 
     approved_users = []
-    if approvals_response.status_code == 200:
-        approvals_data = approvals_response.json()
-
+    if approvals_data is not None:
         if 'approved_by' in approvals_data and approvals_data['approved_by']:
             for approval in approvals_data['approved_by']:
                 user = approval.get('user', {})
@@ -248,14 +925,36 @@ def get_mr_assignees_and_approvals(project_id: str, mr_iid: int, token: str) ->
 
         logger.info(f"approved by count={len(approved_users)}")
     else:
-        logger.warning(f"could not get approval data status={approvals_response.status_code}")
+        logger.warning(f"could not get approval data project_id={project_id} mr_iid={mr_iid}")
+
+    return assignees, approved_users, emails
 
-    return assignees, approved_users
+# ##################################################################
+# get user public email
+# returns the email a gitlab user has made public, or none when they have
+# not, cached for a long time because it rarely changes
+def get_user_public_email(user_id: int, token: str) -> Optional[str]:
+    user = make_gitlab_request(f'https://gitlab.com/api/v4/users/{user_id}', {'PRIVATE-TOKEN': token},
+                               ttl=CACHE_TTL_STATIC)
+    return (user or {}).get('public_email') or None
+
+# ##################################################################
+# get user id
+# resolves a gitlab username to its user id, cached for a long time
+# because the mapping effectively never changes
+def get_user_id(username: str, token: str) -> Optional[int]:
+    headers = {'PRIVATE-TOKEN': token}
+    users = make_gitlab_request('https://gitlab.com/api/v4/users', headers, {'username': username},
+                                ttl=CACHE_TTL_STATIC)
+    if users:
+        return users[0]['id']
+    return None
 
 # ##################################################################
 # add reviewers to merge request
 # adds specified gitlab usernames as reviewers to an mr
-# merges with existing reviewers to avoid duplication
+# merges with existing reviewers to avoid duplication, resolving all
+# usernames concurrently
 def add_reviewers_to_mr(project_id: str, mr_iid: int, usernames: List[str], token: str) -> bool:
     if not token or not usernames:
         return False
@@ -263,48 +962,43 @@ def add_reviewers_to_mr(project_id: str, mr_iid: int, usernames: List[str], toke
     try:
         headers = {'PRIVATE-TOKEN': token}
 
-        mr_response = requests.get(
-            f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}',
-            headers=headers)
-
-        if mr_response.status_code != 200:
-            logger.error(f"failed to get mr data status={mr_response.status_code}")
+        mr_data = fetch_mr_detail(project_id, mr_iid, token)
+        if mr_data is None:
+            logger.error(f"failed to get mr data project_id={project_id} mr_iid={mr_iid}")
             return False
 
-        mr_data = mr_response.json()
         current_reviewer_ids = set()
 
         if 'reviewers' in mr_data and mr_data['reviewers']:
             for reviewer in mr_data['reviewers']:
                 current_reviewer_ids.add(reviewer['id'])
 
+        requested_usernames = list(dict.fromkeys(usernames))
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_REQUESTS, len(requested_usernames))) as executor:
+            user_ids = list(executor.map(lambda username: get_user_id(username, token), requested_usernames))
+
         reviewer_ids_to_add = []
-        for username in usernames:
-            user_response = requests.get(
-                f'https://gitlab.com/api/v4/users',
-                headers=headers,
-                params={'username': username})
-
-            if user_response.status_code == 200:
-                users = user_response.json()
-                if users:
-                    user_id = users[0]['id']
-                    if user_id not in current_reviewer_ids:
-                        reviewer_ids_to_add.append(user_id)
-                        logger.info(f"found user username={username} id={user_id}")
+        for username, user_id in zip(requested_usernames, user_ids):
+            if user_id is not None and user_id not in current_reviewer_ids:
+                current_reviewer_ids.add(user_id)
+                reviewer_ids_to_add.append(user_id)
+                logger.info(f"found user username={username} id={user_id}")
 
         if not reviewer_ids_to_add:
             logger.info("all requested reviewers already assigned")
             return True
 
-        all_reviewer_ids = list(current_reviewer_ids) + reviewer_ids_to_add
+        all_reviewer_ids = list(current_reviewer_ids)
 
-        update_response = requests.put(
+        update_response = _get_session().put(
             f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}',
             headers=headers,
-            json={'reviewer_ids': all_reviewer_ids})
+            json={'reviewer_ids': all_reviewer_ids},
+            timeout=30)
+        _record_rate_limit(update_response)
 
         if update_response.status_code == 200:
+            invalidate(f'https://gitlab.com/api/v4/projects/{project_id}/merge_requests/{mr_iid}')
             logger.info(f"added reviewers usernames={usernames}")
             return True
         else:
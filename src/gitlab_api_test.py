@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+from typing import Any, Dict, Optional
+from unittest import mock
+
+from src import gitlab_api
+
+# a merge request as the rest api returns it, whose assignees and reviewers
+# are basic user objects without any email field
+REST_MR = {
+    'id': 1001,
+    'iid': 42,
+    'project_id': 7,
+    'title': 'Add feature',
+    'state': 'opened',
+    'sha': 'abc123',
+    'source_branch': 'feature',
+    'web_url': 'https://gitlab.com/group/repo/-/merge_requests/42',
+    'assignee': {'id': 1, 'username': 'ada', 'name': 'Ada Lovelace', 'state': 'active',
+                 'avatar_url': 'https://gitlab.com/ada.png', 'web_url': 'https://gitlab.com/ada'},
+    'assignees': [
+        {'id': 1, 'username': 'ada', 'name': 'Ada Lovelace', 'state': 'active',
+         'avatar_url': 'https://gitlab.com/ada.png', 'web_url': 'https://gitlab.com/ada'}
+    ],
+    'reviewers': [
+        {'id': 2, 'username': 'alan', 'name': 'Alan Turing', 'state': 'active',
+         'avatar_url': 'https://gitlab.com/alan.png', 'web_url': 'https://gitlab.com/alan'},
+        {'id': 3, 'username': 'grace', 'name': 'Grace Hopper', 'state': 'active',
+         'avatar_url': 'https://gitlab.com/grace.png', 'web_url': 'https://gitlab.com/grace'}
+    ]
+}
+
+USERS = {
+    1: {'id': 1, 'username': 'ada', 'name': 'Ada Lovelace', 'public_email': 'ada@example.com'},
+    2: {'id': 2, 'username': 'alan', 'name': 'Alan Turing', 'public_email': ''},
+    3: {'id': 3, 'username': 'grace', 'name': 'Grace Hopper', 'public_email': 'grace@example.com'}
+}
+
+APPROVALS = {
+    'approved': False,
+    'approved_by': [{'user': {'id': 3, 'username': 'grace', 'name': 'Grace Hopper'}}]
+}
+
+# ##################################################################
+# fake gitlab request
+# serves user and approval lookups the way gitlab would for these fixtures
+def _fake_gitlab_request(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None,
+                         **kwargs: Any) -> Optional[Any]:
+    if url.endswith('/approvals'):
+        return APPROVALS
+    if '/users/' in url:
+        return USERS.get(int(url.rsplit('/', 1)[1]))
+    return None
+
+# ##################################################################
+# test assignees and approvals from a rest payload
+# names are deduplicated across assignee fields and emails come from the
+# users api because the mr payload itself never carries them
+def test_get_mr_assignees_and_approvals_from_rest_payload() -> None:
+    with mock.patch.object(gitlab_api, 'USE_GRAPHQL', False), \
+            mock.patch.object(gitlab_api, 'make_gitlab_request', side_effect=_fake_gitlab_request):
+        assignees, approved_users, emails = gitlab_api.get_mr_assignees_and_approvals(
+            7, 42, 'token', REST_MR)
+
+    assert assignees == ['Ada Lovelace', 'Alan Turing', 'Grace Hopper']
+    assert approved_users == ['Grace Hopper']
+    assert emails == {'Ada Lovelace': 'ada@example.com', 'Grace Hopper': 'grace@example.com'}
+
+# ##################################################################
+# test assignees without approvals data
+# a failed approvals read leaves every assignee pending instead of raising
+def test_get_mr_assignees_and_approvals_without_approvals() -> None:
+    def fake(url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]] = None,
+             **kwargs: Any) -> Optional[Any]:
+        return None if url.endswith('/approvals') else _fake_gitlab_request(url, headers, params)
+
+    with mock.patch.object(gitlab_api, 'USE_GRAPHQL', False), \
+            mock.patch.object(gitlab_api, 'make_gitlab_request', side_effect=fake):
+        assignees, approved_users, _ = gitlab_api.get_mr_assignees_and_approvals(7, 42, 'token', REST_MR)
+
+    assert assignees == ['Ada Lovelace', 'Alan Turing', 'Grace Hopper']
+    assert approved_users == []
+
+# ##################################################################
+# test invalidate
+# drops the merge request and everything below it but not its siblings
+def test_invalidate_matches_whole_path_segments() -> None:
+    base = 'https://gitlab.com/api/v4/projects/7/merge_requests'
+    urls = [f'{base}/1', f'{base}/1/approvals', f'{base}/1?with_merge_status_recheck=true',
+            f'{base}/10', f'{base}/100/approvals']
+    with mock.patch.object(gitlab_api, '_cache', gitlab_api.OrderedDict()):
+        for url in urls:
+            gitlab_api._cache_store(gitlab_api._cache_key(url, None), (0.0, None, {}))
+
+        gitlab_api.invalidate(f'{base}/1')
+
+        assert [key[0] for key in gitlab_api._cache] == [f'{base}/10', f'{base}/100/approvals']
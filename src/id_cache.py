@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from .gitlab_api import get_current_user, get_project_id
+
+logger = logging.getLogger(__name__)
+
+_cache_file = Path(__file__).parent.parent / "output" / "id_cache.json"
+_cache_lock = threading.Lock()
+
+# ##################################################################
+# load id cache
+# reads persisted gitlab user and project ids from disk
+def _load_id_cache() -> Dict[str, Dict[str, Any]]:
+    try:
+        if _cache_file.exists():
+            with open(_cache_file, 'r') as f:
+                return json.load(f)
+    except Exception as err:
+        logger.warning(f"could not load id cache err={err}")
+    return {}
+
+# ##################################################################
+# save id cache
+# persists gitlab user and project ids atomically so a crash never
+# leaves a truncated cache behind
+def _save_id_cache(cache: Dict[str, Dict[str, Any]]) -> None:
+    try:
+        _cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = _cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, _cache_file)
+    except Exception as err:
+        logger.error(f"error saving id cache err={err}")
+
+# ##################################################################
+# token key
+# derives a stable non-reversible key for a token so cached users are
+# tied to the token that looked them up without storing the token
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:8]
+
+# ##################################################################
+# get or fetch current user
+# returns the authenticated gitlab user, looking it up only when no
+# user has been cached for this token yet
+def get_or_fetch_current_user(token: str) -> Optional[Dict[str, Any]]:
+    key = _token_key(token)
+    with _cache_lock:
+        cache = _load_id_cache()
+        user = cache.get('users', {}).get(key)
+    if user is not None:
+        return user
+
+    user = get_current_user(token)
+    if user is None:
+        return None
+
+    user = {'id': user['id'], 'username': user.get('username'), 'name': user.get('name')}
+    with _cache_lock:
+        cache = _load_id_cache()
+        cache.setdefault('users', {})[key] = user
+        _save_id_cache(cache)
+    return user
+
+# ##################################################################
+# get or fetch project id
+# returns the gitlab project id for owner and repo, looking it up only
+# when the project has not been resolved before
+def get_or_fetch_project_id(owner: str, repo: str, token: str) -> Optional[int]:
+    key = f"{owner}/{repo}"
+    with _cache_lock:
+        cache = _load_id_cache()
+        project_id = cache.get('projects', {}).get(key)
+    if project_id is not None:
+        return project_id
+
+    project_id = get_project_id(owner, repo, token)
+    if project_id is None:
+        return None
+
+    with _cache_lock:
+        cache = _load_id_cache()
+        cache.setdefault('projects', {})[key] = project_id
+        _save_id_cache(cache)
+    return project_id
@@ -3,11 +3,10 @@
 import sys
 import signal
 import logging
-import multiprocessing
 from pathlib import Path
 
-from PySide6.QtCore import QUrl
-from PySide6.QtGui import QGuiApplication
+from PySide6.QtCore import QUrl, QTimer
+from PySide6.QtGui import QGuiApplication, QWindow
 from PySide6.QtQml import QQmlApplicationEngine, qmlRegisterType
 from PySide6.QtQuickControls2 import QQuickStyle
 
@@ -36,11 +35,8 @@ def setup_logging() -> None:
 # ##################################################################
 # main entry point
 # initializes qt application, loads qml ui, and starts event loop
+# file logging and config loading are deferred until the window is up
 def main() -> int:
-    setup_logging()
-
-    multiprocessing.set_start_method('spawn', force=True)
-
     QQuickStyle.setStyle("Material")
 
     app = QGuiApplication(sys.argv)
@@ -68,8 +64,17 @@ def main() -> int:
         logger.error("failed to load qml file")
         return -1
 
-    controller.load_config()
-    controller.initialize_data()
+    window = engine.rootObjects()[0]
+    window.visibilityChanged.connect(
+        lambda visibility: controller.set_visible(visibility not in (QWindow.Hidden, QWindow.Minimized)))
+    app.applicationStateChanged.connect(controller.set_application_state)
+
+    def start() -> None:
+        setup_logging()
+        controller.load_config()
+        controller.initialize_data()
+
+    QTimer.singleShot(0, start)
 
     result = app.exec()
 
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 
+import bisect
 from PySide6.QtCore import QAbstractListModel, Qt, QModelIndex
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 # ##################################################################
 # merge request model
 # qt model for displaying merge request data in qml listview
 # handles data updates per repo while maintaining stable ordering
+# rows are stored as one list per field so role lookups are a single index
 class MRModel(QAbstractListModel):
     RepoRole = Qt.UserRole + 1
     MRRole = Qt.UserRole + 2
@@ -16,41 +18,52 @@ class MRModel(QAbstractListModel):
     PipelineUrlRole = Qt.UserRole + 6
     BranchRole = Qt.UserRole + 7
 
+    _ROLE_FIELD = {
+        RepoRole: 'repo',
+        MRRole: 'mr',
+        TitleRole: 'title',
+        StatusPillsRole: 'status_pills',
+        MRUrlRole: 'mr_url',
+        PipelineUrlRole: 'pipeline_url',
+        BranchRole: 'branch'
+    }
+
+    _FIELDS = ('repo', 'mr', 'title', 'status_pills', 'mr_url', 'pipeline_url', 'branch',
+               'key', 'mr_num', 'sort_key')
+
     def __init__(self) -> None:
         super().__init__()
-        self._data: List[Dict[str, Any]] = []
+        self._repo: List[str] = []
+        self._mr: List[str] = []
+        self._title: List[str] = []
+        self._status_pills: List[List[Dict[str, str]]] = []
+        self._mr_url: List[str] = []
+        self._pipeline_url: List[str] = []
+        self._branch: List[str] = []
+        self._key: List[str] = []
+        self._mr_num: List[int] = []
+        self._sort_key: List[Tuple[str, int]] = []
+
+        self._columns = (self._repo, self._mr, self._title, self._status_pills, self._mr_url,
+                         self._pipeline_url, self._branch, self._key, self._mr_num, self._sort_key)
+        self._role_to_column = {role: getattr(self, f'_{field}') for role, field in self._ROLE_FIELD.items()}
 
     # ##################################################################
     # row count
     # returns number of merge requests in the model
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
-        return len(self._data)
+        return len(self._repo)
 
     # ##################################################################
     # data accessor
     # retrieves specific field data for a merge request by role
     def data(self, index: QModelIndex, role: int) -> Any:
-        if not index.isValid() or index.row() >= len(self._data):
+        column = self._role_to_column.get(role)
+        row = index.row()
+        if column is None or not index.isValid() or row >= len(column):
             return None
 
-        item = self._data[index.row()]
-
-        if role == MRModel.RepoRole:
-            return item['repo']
-        elif role == MRModel.MRRole:
-            return item['mr']
-        elif role == MRModel.TitleRole:
-            return item['title']
-        elif role == MRModel.StatusPillsRole:
-            return item['status_pills']
-        elif role == MRModel.MRUrlRole:
-            return item['mr_url']
-        elif role == MRModel.PipelineUrlRole:
-            return item['pipeline_url']
-        elif role == MRModel.BranchRole:
-            return item['branch']
-
-        return None
+        return column[row]
 
     # ##################################################################
     # role names
@@ -66,61 +79,123 @@ class MRModel(QAbstractListModel):
             MRModel.BranchRole: b"branch"
         }
 
+    # ##################################################################
+    # sort key
+    # orders merge requests by repo name then mr number for consistent display
+    # caching the parsed mr number on the item so it is computed once
+    @staticmethod
+    def _make_sort_key(data: Dict[str, Any]) -> Tuple[str, int]:
+        data['mr_num'] = int(str(data.get('mr', '!0')).lstrip('!') or 0)
+        return data.get('repo', ''), data['mr_num']
+
+    # ##################################################################
+    # insert position
+    # finds the sorted position for a key so the model never needs a resort
+    def _insert_position(self, sort_key: Tuple[str, int]) -> int:
+        return bisect.bisect_left(self._sort_key, sort_key)
+
+    # ##################################################################
+    # row values
+    # returns the stored values of one row in field order
+    def _row_values(self, row: int) -> Tuple[Any, ...]:
+        return tuple(column[row] for column in self._columns)
+
+    # ##################################################################
+    # item values
+    # returns the values of an incoming item in field order
+    def _item_values(self, item: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(item[field] for field in self._FIELDS)
+
+    # ##################################################################
+    # set rows
+    # replaces rows start to end exclusive with the given items in every column
+    def _set_rows(self, start: int, end: int, items: List[Dict[str, Any]]) -> None:
+        for column, field in zip(self._columns, self._FIELDS):
+            column[start:end] = [item[field] for item in items]
+
     # ##################################################################
     # add merge request
-    # appends a new merge request to the model with unique key
+    # inserts a new merge request at its sorted position with unique key
     def add_mr(self, data: Dict[str, Any]) -> None:
         data['key'] = f"{data['repo']}-{data['mr']}"
-        self.beginInsertRows(QModelIndex(), len(self._data), len(self._data))
-        self._data.append(data)
+        data['sort_key'] = self._make_sort_key(data)
+        row = self._insert_position(data['sort_key'])
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._set_rows(row, row, [data])
         self.endInsertRows()
 
     # ##################################################################
     # update repository data
     # replaces all merge requests for a specific repo while maintaining order
-    def update_repo_data(self, repo_name: str, new_items: List[Dict[str, Any]]) -> None:
-        existing_items = {item['key']: item for item in self._data if item.get('key')}
+    # when the same mrs are still open only the changed rows are refreshed
+    # returns whether any row was inserted, removed, or changed
+    def update_repo_data(self, repo_name: str, new_items: List[Dict[str, Any]]) -> bool:
+        for new_item in new_items:
+            new_item['key'] = f"{repo_name}-{new_item['mr']}"
+            new_item['sort_key'] = self._make_sort_key(new_item)
 
-        self.clear_repo(repo_name)
+        rows = [i for i, repo in enumerate(self._repo) if repo == repo_name]
+        new_items = sorted(new_items, key=lambda x: x['sort_key'])
 
-        for new_item in new_items:
-            key = f"{repo_name}-{new_item['mr']}"
-            new_item['key'] = key
+        if rows and rows[-1] - rows[0] + 1 == len(rows) and \
+                [self._key[i] for i in rows] == [item['key'] for item in new_items]:
+            changed = [i for i, new_item in zip(rows, new_items)
+                       if self._row_values(i) != self._item_values(new_item)]
+            if changed:
+                self._set_rows(rows[0], rows[-1] + 1, new_items)
+                self.dataChanged.emit(self.index(changed[0]), self.index(changed[-1]))
+            return bool(changed)
 
-            self.beginInsertRows(QModelIndex(), len(self._data), len(self._data))
-            self._data.append(new_item)
-            self.endInsertRows()
+        if not rows and not new_items:
+            return False
 
-        self._sort_data()
+        self.clear_repo(repo_name)
 
-    # ##################################################################
-    # sort data
-    # sorts merge requests by repo name then mr number for consistent display
-    def _sort_data(self) -> None:
-        if not self._data:
-            return
+        if new_items:
+            row = self._insert_position(new_items[0]['sort_key'])
+            self.beginInsertRows(QModelIndex(), row, row + len(new_items) - 1)
+            self._set_rows(row, row, new_items)
+            self.endInsertRows()
+        return True
 
-        self.beginResetModel()
-        self._data.sort(key=lambda x: (x.get('repo', ''), int(x.get('mr', '!0')[1:] or 0)))
-        self.endResetModel()
+    # ##################################################################
+    # bulk update
+    # applies the merge requests of several repos received together, each
+    # repo emitting only the row signals its own changes require
+    # returns whether any repo's rows changed
+    def bulk_update(self, items_by_repo: Dict[str, List[Dict[str, Any]]]) -> bool:
+        changed = False
+        for repo_name, new_items in items_by_repo.items():
+            changed = self.update_repo_data(repo_name, new_items) or changed
+        return changed
 
     # ##################################################################
     # clear repository
     # removes all merge requests for a specific repository from model
+    # issuing one removal per contiguous run of rows instead of per row
     def clear_repo(self, repo_name: str) -> None:
-        i = 0
-        while i < len(self._data):
-            if self._data[i]['repo'] == repo_name:
-                self.beginRemoveRows(QModelIndex(), i, i)
-                del self._data[i]
-                self.endRemoveRows()
-            else:
-                i += 1
+        ranges = []
+        start = None
+        for i, repo in enumerate(self._repo):
+            if repo == repo_name:
+                if start is None:
+                    start = i
+            elif start is not None:
+                ranges.append((start, i - 1))
+                start = None
+        if start is not None:
+            ranges.append((start, len(self._repo) - 1))
+
+        for start, end in reversed(ranges):
+            self.beginRemoveRows(QModelIndex(), start, end)
+            self._set_rows(start, end + 1, [])
+            self.endRemoveRows()
 
     # ##################################################################
     # clear all
     # removes all merge requests from the model
     def clear_all(self) -> None:
         self.beginResetModel()
-        self._data.clear()
+        for column in self._columns:
+            column.clear()
         self.endResetModel()
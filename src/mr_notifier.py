@@ -2,21 +2,85 @@
 
 import os
 import json
+import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 import keyring
 from colorama import Fore, Style
 
 logger = logging.getLogger(__name__)
 
+# ##################################################################
+# env number
+# reads a numeric setting from the environment, falling back to the
+# default when it is unset or malformed and never going below minimum
+def _env_number(name: str, default: float, minimum: float, cast: type = int) -> Any:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return max(minimum, cast(value))
+    except ValueError:
+        logger.warning("ignoring invalid setting name=%s value=%s", name, value)
+        return default
+
+MAX_CONCURRENT_NOTIFICATIONS = _env_number('MR_MAX_CONCURRENT', 6, 1)
+SLACK_MAX_CONCURRENT_REQUESTS = _env_number('SLACK_MAX_CONCURRENT_REQUESTS', 3, 1)
+MAX_PAGINATION_TIMEOUT_SECONDS = _env_number('MAX_PAGINATION_TIMEOUT_SECONDS', 30.0, 1.0, float)
+PERSON_CACHE_TTL = 86400
+PERSON_CACHE_MISS_TTL = 3600
+SLACK_ROSTER_TTL = PERSON_CACHE_MISS_TTL
+
+# ##################################################################
+# atomic write json
+# writes compact json to a temporary file and renames it into place so a
+# crash mid write never leaves a truncated state file behind
+def _atomic_write_json(path: Path, obj: Any) -> None:
+    tmp_file = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(obj, f, separators=(',', ':'))
+    os.replace(tmp_file, path)
+
+# ##################################################################
+# token bucket
+# shapes outgoing slack calls to a steady rate with a small burst
+# allowance so parallel notifier threads don't trip slack's rate limits
+class _TokenBucket:
+    def __init__(self, capacity: int, refill_per_sec: float) -> None:
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    # ##################################################################
+    # acquire
+    # blocks until a token is available and takes it
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.refill_per_sec)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.refill_per_sec
+            time.sleep(wait)
+
 # ##################################################################
 # merge request notifier
 # sends slack notifications for merge requests requiring review
 # tracks notification state to prevent duplicates per day
 class MRNotifier:
+    _TOKENS: Dict[Tuple[str, str], str] = {}
+
     def __init__(self, state_dir: Optional[Path] = None) -> None:
         if state_dir is None:
             script_dir = Path(__file__).parent.resolve()
@@ -24,148 +88,355 @@ class MRNotifier:
         else:
             self.state_dir = Path(state_dir)
 
-        logger.info(f"mr notifier state dir={self.state_dir}")
+        logger.info("mr notifier state dir=%s", self.state_dir)
 
         try:
             self.state_dir.mkdir(parents=True, exist_ok=True)
-            logger.info(f"state directory verified path={self.state_dir}")
+            logger.info("state directory verified path=%s", self.state_dir)
         except Exception as err:
-            logger.error(f"error creating state directory path={self.state_dir} err={err}")
+            logger.error("error creating state directory path=%s err=%s", self.state_dir, err)
+
+        self._lock = threading.Lock()
+        self._user_index_lock = threading.Lock()
+        self._slack_semaphore = threading.BoundedSemaphore(SLACK_MAX_CONCURRENT_REQUESTS)
+        self._slack_bucket = _TokenBucket(capacity=5, refill_per_sec=1.0)
 
         self.person_cache_file = self.state_dir / "person_translations.json"
+        self._cache_dirty = False
         self.person_cache = self._load_person_cache()
+        self._user_index: Dict[str, str] = {}
+        self._user_alias_index: Dict[str, str] = {}
+        self._users_cursor: Optional[str] = ''
+        self._roster_fetched_at = 0.0
 
-        self.slack_token = keyring.get_password("slack", "token")
-        self.gitlab_token = keyring.get_password("gitlab", "token")
+        self._notif_state_file = self.state_dir / "notifications.json"
+        self._notif_state = self._load_notification_state()
+        self._notif_dirty = False
 
-        if not self.slack_token:
-            logger.error("no slack token found in keyring")
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
-        if not self.gitlab_token:
-            logger.error("no gitlab token found in keyring")
+    # ##################################################################
+    # get token
+    # reads a token from the keyring on first use and shares it with every
+    # notifier in the process so the keychain is only queried once
+    @classmethod
+    def _get_token(cls, service: str) -> str:
+        key = (service, 'token')
+        if key not in cls._TOKENS:
+            token = keyring.get_password(service, 'token') or ''
+            if not token:
+                logger.error("no %s token found in keyring", service)
+            cls._TOKENS[key] = token
+        return cls._TOKENS[key]
+
+    # ##################################################################
+    # slack token
+    # bot token used for every slack api call
+    @property
+    def slack_token(self) -> str:
+        return self._get_token('slack')
+
+    # ##################################################################
+    # gitlab token
+    # personal access token used to read assignees and approvals
+    @property
+    def gitlab_token(self) -> str:
+        return self._get_token('gitlab')
+
+    # ##################################################################
+    # close
+    # flushes pending state changes and releases pooled slack connections
+    def close(self) -> None:
+        self._flush_person_cache()
+        self._flush_notification_state()
+        self.session.close()
+
+    # ##################################################################
+    # slack request
+    # sends one request over the shared slack session while capping how
+    # many notifier threads talk to slack at the same time and how fast
+    # retrying once after the advertised delay when slack rate limits us
+    def _slack_request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        if 'Authorization' not in self.session.headers:
+            self.session.headers['Authorization'] = f'Bearer {self.slack_token}'
+        for attempt in range(2):
+            self._slack_bucket.acquire()
+            with self._slack_semaphore:
+                response = self.session.request(method, url, **kwargs)
+            if response.status_code != 429 or attempt:
+                return response
+
+            retry_after = float(response.headers.get('Retry-After', 1))
+            logger.warning("slack rate limited url=%s retry_after=%s", url, retry_after)
+            time.sleep(retry_after)
+        return response
 
     # ##################################################################
     # load person cache
     # retrieves cached gitlab name to slack user id mappings from disk
-    def _load_person_cache(self) -> Dict[str, Optional[str]]:
+    # upgrading entries from the old name to id schema as they are read
+    def _load_person_cache(self) -> Dict[str, Dict[str, Any]]:
         try:
             if self.person_cache_file.exists():
                 with open(self.person_cache_file, 'r') as f:
-                    return json.load(f)
+                    cache = json.load(f)
+                if any(not isinstance(entry, dict) for entry in cache.values()):
+                    self._cache_dirty = True
+                return {name: self._upgrade_person_entry(entry) for name, entry in cache.items()}
         except Exception as err:
-            logger.warning(f"could not load person cache err={err}")
+            logger.warning("could not load person cache err=%s", err)
         return {}
 
+    # ##################################################################
+    # upgrade person entry
+    # converts a bare slack user id from the old cache schema into an
+    # entry that expires like a fresh lookup would
+    @classmethod
+    def _upgrade_person_entry(cls, entry: Any) -> Dict[str, Any]:
+        if isinstance(entry, dict):
+            return entry
+        return cls._person_entry(entry)
+
+    # ##################################################################
+    # person entry
+    # builds a cache entry for a lookup result, expiring misses sooner so
+    # they are retried against a roster refetched since the miss
+    @staticmethod
+    def _person_entry(user_id: Optional[str]) -> Dict[str, Any]:
+        ttl = PERSON_CACHE_TTL if user_id else PERSON_CACHE_MISS_TTL
+        return {'id': user_id, 'exp': int(time.time()) + ttl}
+
+    # ##################################################################
+    # lookup cached
+    # returns the unexpired cache entry for a person or none when they
+    # need to be looked up again
+    def _lookup_cached(self, person_name: str) -> Optional[Dict[str, Any]]:
+        entry = self.person_cache.get(person_name)
+        if entry is None or entry['exp'] <= time.time():
+            return None
+        return entry
+
     # ##################################################################
     # save person cache
     # persists gitlab name to slack user id mappings to avoid repeated lookups
     def _save_person_cache(self) -> None:
         try:
-            with open(self.person_cache_file, 'w') as f:
-                json.dump(self.person_cache, f, indent=2)
+            _atomic_write_json(self.person_cache_file, self.person_cache)
         except Exception as err:
-            logger.error(f"error saving person cache err={err}")
+            logger.error("error saving person cache err=%s", err)
 
     # ##################################################################
-    # get notification date file
-    # returns path to file tracking last notification date for specific mr
-    def _get_notification_date_file(self, mr_key: str) -> Path:
-        safe_mr_key = mr_key.replace('/', '_').replace('!', '_')
-        return self.state_dir / f"notified_{safe_mr_key}.date"
+    # flush person cache
+    # saves the person cache once if any lookup changed it since the last save
+    def _flush_person_cache(self) -> None:
+        with self._lock:
+            if self._cache_dirty:
+                self._save_person_cache()
+                self._cache_dirty = False
 
     # ##################################################################
-    # should notify
-    # checks if notification should be sent today based on last notification date
-    def _should_notify(self, mr_key: str) -> bool:
-        date_file = self._get_notification_date_file(mr_key)
-
-        if not date_file.exists():
-            return True
+    # load notification state
+    # retrieves the last notification date of every mr key from disk
+    def _load_notification_state(self) -> Dict[str, str]:
+        try:
+            if self._notif_state_file.exists():
+                with open(self._notif_state_file, 'r') as f:
+                    return json.load(f)
+        except Exception as err:
+            logger.warning("could not load notification state err=%s", err)
+        return {}
 
+    # ##################################################################
+    # save notification state
+    # persists the last notification date of every mr key in one file
+    def _save_notification_state(self) -> None:
         try:
-            with open(date_file, 'r') as f:
-                last_notified = f.read().strip()
+            _atomic_write_json(self._notif_state_file, self._notif_state)
+        except Exception as err:
+            logger.error("error saving notification state err=%s", err)
 
-            today = date.today().isoformat()
-            return last_notified != today
+    # ##################################################################
+    # flush notification state
+    # saves the notification state once if any mr was marked since the last save
+    def _flush_notification_state(self) -> None:
+        with self._lock:
+            if self._notif_dirty:
+                self._save_notification_state()
+                self._notif_dirty = False
 
-        except Exception as err:
-            logger.warning(f"could not read notification date mr_key={mr_key} err={err}")
-            return True
+    # ##################################################################
+    # should notify
+    # checks if notification should be sent today based on last notification date
+    def _should_notify(self, mr_key: str, today_iso: Optional[str] = None) -> bool:
+        return self._notif_state.get(mr_key) != (today_iso or date.today().isoformat())
 
     # ##################################################################
     # mark notified
     # records that notification was sent today for this merge request
-    def _mark_notified(self, mr_key: str) -> None:
-        date_file = self._get_notification_date_file(mr_key)
-        today = date.today().isoformat()
+    def _mark_notified(self, mr_key: str, today_iso: Optional[str] = None) -> None:
+        today = today_iso or date.today().isoformat()
+        logger.info("marking notified mr_key=%s date=%s", mr_key, today)
+        with self._lock:
+            self._notif_state[mr_key] = today
+            self._notif_dirty = True
 
-        logger.info(f"marking notified mr_key={mr_key} date={today} file={date_file}")
+    # ##################################################################
+    # build user index
+    # maps every known name of each active member in lowercase, with and
+    # without spaces, to their slack user id and separately maps their first
+    # and last name tokens as weaker aliases, keeping the first member seen
+    @staticmethod
+    def _build_user_index(members: List[Dict[str, Any]]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        user_index = {}
+        alias_index = {}
+        for user in members:
+            if user.get('deleted'):
+                continue
+            profile = user.get('profile', {})
+            for name in (user.get('real_name'), user.get('display_name'), user.get('name'),
+                         profile.get('display_name'), profile.get('real_name')):
+                if not name:
+                    continue
+                name = name.lower()
+                user_index.setdefault(name, user['id'])
+                user_index.setdefault(name.replace(' ', ''), user['id'])
+                tokens = name.split()
+                if len(tokens) > 1:
+                    alias_index.setdefault(tokens[0], user['id'])
+                    alias_index.setdefault(tokens[-1], user['id'])
+        return user_index, alias_index
 
-        try:
-            with open(date_file, 'w') as f:
-                f.write(today)
-            logger.info(f"notification marker created successfully")
-
-            if date_file.exists():
-                with open(date_file, 'r') as f:
-                    content = f.read().strip()
-                    logger.info(f"verified file content={content}")
-            else:
-                logger.error("file does not exist after creation")
+    # ##################################################################
+    # match user exactly
+    # looks a lowercase name up by its full form, its spaceless form and
+    # finally as a first or last name alias
+    def _match_user_exactly(self, needle: str) -> Optional[str]:
+        return (self._user_index.get(needle) or self._user_index.get(needle.replace(' ', ''))
+                or self._user_alias_index.get(needle))
 
-        except Exception as err:
-            logger.error(f"error marking notification sent mr_key={mr_key} err={err}")
+    # ##################################################################
+    # fetch slack users
+    # pages through the workspace member list with a cursor and indexes each
+    # page as it arrives, stopping early once the needle is indexed or the
+    # time budget runs out so a later call resumes where this one stopped
+    def _fetch_slack_users(self, needle: Optional[str] = None) -> None:
+        deadline = time.monotonic() + MAX_PAGINATION_TIMEOUT_SECONDS
+        while self._users_cursor is not None and not (needle and self._match_user_exactly(needle)):
+            if time.monotonic() > deadline:
+                logger.warning("slack users pagination timed out members=%s", len(self._user_index))
+                return
+
+            params = {'limit': 200}
+            if self._users_cursor:
+                params['cursor'] = self._users_cursor
+            response = self._slack_request('GET', 'https://slack.com/api/users.list', params=params)
+
+            if response.status_code != 200:
+                logger.error("failed to get slack users status=%s", response.status_code)
+                return
+
+            data = response.json()
+            if not data.get('ok'):
+                logger.error("slack api error=%s", data.get('error'))
+                return
+
+            user_index, alias_index = self._build_user_index(data['members'])
+            for name, user_id in user_index.items():
+                self._user_index.setdefault(name, user_id)
+            for name, user_id in alias_index.items():
+                self._user_alias_index.setdefault(name, user_id)
+            self._users_cursor = (data.get('response_metadata') or {}).get('next_cursor') or None
+            if self._users_cursor is None:
+                self._roster_fetched_at = time.monotonic()
+
+    # ##################################################################
+    # expire roster
+    # starts the member list over once a fully paged roster is older than
+    # its ttl so accounts created since then can be found
+    def _expire_roster(self) -> None:
+        if self._users_cursor is None and time.monotonic() - self._roster_fetched_at >= SLACK_ROSTER_TTL:
+            self._user_index = {}
+            self._user_alias_index = {}
+            self._users_cursor = ''
+
+    # ##################################################################
+    # search slack users
+    # finds a slack user id by exact name and only falls back to a partial
+    # name scan once the whole roster is indexed and nothing matched, reporting
+    # whether the whole roster was searched so misses are only cached then
+    # concurrent callers share the pages fetched so far instead of refetching
+    def _search_slack_users(self, person_name: str) -> Tuple[Optional[str], bool]:
+        needle = person_name.lower()
+        with self._user_index_lock:
+            self._expire_roster()
+            self._fetch_slack_users(needle)
+            complete = self._users_cursor is None
+
+            user_id = self._match_user_exactly(needle)
+            if user_id is None and complete:
+                user_id = next((uid for name, uid in self._user_index.items() if needle in name), None)
+            return user_id, complete
+
+    # ##################################################################
+    # lookup slack user by email
+    # resolves a slack user id with a single targeted api call instead of
+    # scanning the whole workspace roster
+    def _lookup_slack_user_by_email(self, email: str) -> Optional[str]:
+        response = self._slack_request('GET', 'https://slack.com/api/users.lookupByEmail',
+                                       params={'email': email})
+        if response.status_code != 200:
+            logger.warning("failed to look up slack user by email status=%s", response.status_code)
+            return None
+
+        data = response.json()
+        if not data.get('ok'):
+            logger.info("no slack user for email error=%s", data.get('error'))
+            return None
+        return data['user']['id']
 
     # ##################################################################
     # get slack user id
-    # translates gitlab person name to slack user id using cache
-    def _get_slack_user_id(self, person_name: str) -> Optional[str]:
-        if person_name in self.person_cache:
-            return self.person_cache[person_name]
+    # translates gitlab person name to slack user id using the expiring cache
+    # trying a direct email lookup first when gitlab published the email,
+    # then the in memory workspace member index, preferring an exact name
+    # match over a partial one
+    def _get_slack_user_id(self, person_name: str, email: Optional[str] = None) -> Optional[str]:
+        cache_key = f"{person_name} <{email}>" if email else person_name
+        with self._lock:
+            entry = self._lookup_cached(cache_key)
+        if entry is not None:
+            return entry['id']
 
         if not self.slack_token:
             return None
 
         try:
-            headers = {'Authorization': f'Bearer {self.slack_token}'}
-            response = requests.get('https://slack.com/api/users.list', headers=headers)
-
-            if response.status_code != 200:
-                logger.error(f"failed to get slack users status={response.status_code}")
-                return None
-
-            data = response.json()
-            if not data.get('ok'):
-                logger.error(f"slack api error={data.get('error')}")
+            user_id = self._lookup_slack_user_by_email(email) if email else None
+            if user_id is not None:
+                with self._lock:
+                    self.person_cache[cache_key] = self._person_entry(user_id)
+                    self._cache_dirty = True
+                return user_id
+
+            user_id, complete = self._search_slack_users(person_name)
+            if user_id is not None:
+                with self._lock:
+                    self.person_cache[cache_key] = self._person_entry(user_id)
+                    self._cache_dirty = True
+                return user_id
+
+            if not complete:
                 return None
 
-            for user in data['members']:
-                if user.get('deleted', False):
-                    continue
-
-                names_to_check = [
-                    user.get('real_name', ''),
-                    user.get('display_name', ''),
-                    user.get('name', ''),
-                    user.get('profile', {}).get('display_name', ''),
-                    user.get('profile', {}).get('real_name', '')
-                ]
-
-                for name in names_to_check:
-                    if name and person_name.lower() in name.lower():
-                        user_id = user['id']
-                        self.person_cache[person_name] = user_id
-                        self._save_person_cache()
-                        return user_id
-
-            self.person_cache[person_name] = None
-            self._save_person_cache()
-            logger.warning(f"could not find slack user person_name={person_name}")
+            with self._lock:
+                self.person_cache[cache_key] = self._person_entry(None)
+                self._cache_dirty = True
+            logger.warning("could not find slack user person_name=%s", person_name)
             return None
 
         except Exception as err:
-            logger.error(f"error looking up slack user person_name={person_name} err={err}")
+            logger.error("error looking up slack user person_name=%s err=%s", person_name, err)
             return None
 
     # ##################################################################
@@ -195,7 +466,7 @@ class MRNotifier:
             return False
 
         except Exception as err:
-            logger.error(f"error checking or adding coverage reviewers err={err}")
+            logger.error("error checking or adding coverage reviewers err=%s", err)
             return False
 
     # ##################################################################
@@ -206,11 +477,6 @@ class MRNotifier:
             return False
 
         try:
-            headers = {
-                'Authorization': f'Bearer {self.slack_token}',
-                'Content-Type': 'application/json'
-            }
-
             channel_name = "#squad-lending-pr"
 
             payload = {
@@ -218,35 +484,34 @@ class MRNotifier:
                 'text': message
             }
 
-            response = requests.post('https://slack.com/api/chat.postMessage',
-                                   headers=headers,
-                                   json=payload)
+            response = self._slack_request('POST', 'https://slack.com/api/chat.postMessage', json=payload)
 
             if response.status_code != 200:
-                logger.error(f"failed to send slack message status={response.status_code}")
+                logger.error("failed to send slack message status=%s", response.status_code)
                 return False
 
             data = response.json()
             if data.get('ok'):
                 return True
             else:
-                logger.error(f"failed to send slack message error={data.get('error')}")
+                logger.error("failed to send slack message error=%s", data.get('error'))
                 return False
 
         except Exception as err:
-            logger.error(f"error sending slack message err={err}")
+            logger.error("error sending slack message err=%s", err)
             return False
 
     # ##################################################################
     # format notification message
     # creates concise single line slack message mentioning pending reviewers
-    def _format_notification_message(self, mr_data: Dict[str, Any], assignees: List[str]) -> str:
+    def _format_notification_message(self, mr_data: Dict[str, Any], assignees: List[str],
+                                     emails: Optional[Dict[str, str]] = None) -> str:
         mr = mr_data['mr']
         mr_url = mr['web_url']
 
         assignee_mentions = []
         for assignee in assignees:
-            slack_user_id = self._get_slack_user_id(assignee)
+            slack_user_id = self._get_slack_user_id(assignee, (emails or {}).get(assignee))
             if slack_user_id:
                 assignee_mentions.append(f"<@{slack_user_id}>")
             else:
@@ -262,100 +527,138 @@ class MRNotifier:
         return message
 
     # ##################################################################
-    # process merge request for notification
-    # checks if mr needs notification and sends it with pending reviewer list
-    def process_mr_for_notification(self, mr_data: Dict[str, Any]) -> bool:
+    # collect pending reviewers
+    # checks if mr needs notification and fetches the reviewers who have
+    # not approved yet along with any emails gitlab knows for them
+    def _collect_pending_reviewers(self, mr_data: Dict[str, Any], today_iso: Optional[str] = None
+                                   ) -> Optional[Tuple[str, List[str], Dict[str, str]]]:
         from .gitlab_api import get_mr_assignees_and_approvals
 
-        logger.info(f"processing mr for notification keys={list(mr_data.keys())}")
+        logger.info("processing mr for notification keys=%s", mr_data.keys())
 
         try:
             repo_name = mr_data.get('repo_name', 'unknown')
-            mr = mr_data['mr']
-            mr_iid = mr['iid']
-
-            mr_key = f"{repo_name}-{mr_iid}"
+            mr_iid = mr_data['mr']['iid']
+            mr_key = self._mr_key(mr_data)
 
-            logger.info(f"processing mr repo={repo_name} iid={mr_iid} key={mr_key}")
+            logger.info("processing mr repo=%s iid=%s key=%s", repo_name, mr_iid, mr_key)
 
-            should_notify = self._should_notify(mr_key)
-            logger.info(f"should notify={should_notify}")
+            should_notify = self._should_notify(mr_key, today_iso)
+            logger.info("should notify=%s", should_notify)
 
             if not should_notify:
                 logger.info("already notified today")
-                return False
+                return None
 
             logger.info("new mr or not notified today")
 
             if 'project_id' not in mr_data:
-                logger.error(f"no project id in mr data available_keys={list(mr_data.keys())}")
-                return False
+                logger.error("no project id in mr data available_keys=%s", mr_data.keys())
+                return None
 
             project_id = mr_data['project_id']
-            logger.info(f"using project id={project_id}")
+            logger.info("using project id=%s", project_id)
 
             if 'approval_status' in mr_data:
                 approval_status = mr_data['approval_status']
                 if approval_status.get('approved_by_all', False):
                     logger.info("mr has received all required approvals")
-                    self._mark_notified(mr_key)
-                    return False
+                    self._mark_notified(mr_key, today_iso)
+                    return None
 
             logger.info("checking if coverage reviewers needed")
             self._check_and_add_coverage_reviewers(project_id, mr_iid, mr_data)
 
             logger.info("fetching assignees and approvals from gitlab")
-            assignees, approved_users = get_mr_assignees_and_approvals(project_id, mr_iid, self.gitlab_token)
-            logger.info(f"found assignees={assignees} approved={approved_users}")
+            assignees, approved_users, emails = get_mr_assignees_and_approvals(
+                project_id, mr_iid, self.gitlab_token)
+            logger.info("found assignees=%s approved=%s", assignees, approved_users)
 
             pending_reviewers = [assignee for assignee in assignees if assignee not in approved_users]
-            logger.info(f"pending reviewers={pending_reviewers}")
+            logger.info("pending reviewers=%s", pending_reviewers)
 
             if not assignees:
                 logger.warning("no assignees found")
-                self._mark_notified(mr_key)
-                return False
+                self._mark_notified(mr_key, today_iso)
+                return None
 
             if not pending_reviewers:
                 logger.info("all assignees have already approved")
-                self._mark_notified(mr_key)
-                return False
+                self._mark_notified(mr_key, today_iso)
+                return None
 
-            logger.info(f"processing pending reviewers count={len(pending_reviewers)}")
+            logger.info("processing pending reviewers count=%s", len(pending_reviewers))
+            return mr_key, pending_reviewers, emails
 
-            message = self._format_notification_message(mr_data, pending_reviewers)
-            logger.info(f"formatted message={message}")
+        except Exception as err:
+            logger.error("error in process mr for notification err=%s", err)
+            return None
 
-            if self._send_slack_message(message):
-                logger.info("notification sent successfully")
-                self._mark_notified(mr_key)
-                return True
-            else:
-                logger.error("failed to send notification")
-                return False
+    # ##################################################################
+    # mr key
+    # identifies an mr in the notification state file
+    @staticmethod
+    def _mr_key(mr_data: Dict[str, Any]) -> str:
+        return f"{mr_data.get('repo_name', 'unknown')}-{mr_data['mr']['iid']}"
 
-        except Exception as err:
-            logger.error(f"error in process mr for notification err={err}")
-            return False
+    # ##################################################################
+    # prefetch slack ids
+    # resolves every distinct pending reviewer once before any message is
+    # formatted so reviewers shared across mrs are only looked up once
+    def _prefetch_slack_ids(self, people: Dict[str, Optional[str]]) -> None:
+        for person_name, email in people.items():
+            self._get_slack_user_id(person_name, email)
 
     # ##################################################################
     # process merge request list
-    # sends notifications for all merge requests needing review
-    def process_mr_list(self, mr_list: List[Dict[str, Any]]) -> int:
+    # sends one slack message covering all merge requests needing review
+    # fetching reviewers for several mrs at once since each waits on gitlab,
+    # then resolving every distinct reviewer before formatting any message
+    # returns the mrs whose notification is recorded for today, leaving out
+    # any that failed so callers can retry them
+    def process_mr_list(self, mr_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         if not mr_list:
             logger.info("no mrs to process")
-            return 0
+            return []
 
-        logger.info(f"processing mrs count={len(mr_list)}")
+        logger.info("processing mrs count=%s", len(mr_list))
+
+        today_iso = date.today().isoformat()
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_NOTIFICATIONS) as executor:
+            futures = [executor.submit(self._collect_pending_reviewers, mr_data, today_iso)
+                       for mr_data in mr_list]
+            collected = [(mr_data, future.result()) for mr_data, future in zip(mr_list, futures)]
+            collected = [(mr_data, result) for mr_data, result in collected if result]
+
+        people: Dict[str, Optional[str]] = {}
+        for _, (_, pending_reviewers, emails) in collected:
+            for person_name in pending_reviewers:
+                people.setdefault(person_name, emails.get(person_name))
+        self._prefetch_slack_ids(people)
+
+        pending = []
+        for mr_data, (mr_key, pending_reviewers, emails) in collected:
+            message = self._format_notification_message(mr_data, pending_reviewers, emails)
+            logger.info("formatted message=%s", message)
+            pending.append((mr_key, message))
 
         notifications_sent = 0
-        for mr_data in mr_list:
-            if self.process_mr_for_notification(mr_data):
-                notifications_sent += 1
+        if pending:
+            if self._send_slack_message("\n".join(message for _, message in pending)):
+                logger.info("notification sent successfully count=%s", len(pending))
+                for mr_key, _ in pending:
+                    self._mark_notified(mr_key, today_iso)
+                notifications_sent = len(pending)
+            else:
+                logger.error("failed to send notification")
+
+        self._flush_person_cache()
+        self._flush_notification_state()
 
         if notifications_sent > 0:
-            logger.info(f"sent notifications count={notifications_sent}")
+            logger.info("sent notifications count=%s", notifications_sent)
         else:
             logger.info("no notifications sent")
 
-        return notifications_sent
+        return [mr_data for mr_data in mr_list
+                if 'mr' in mr_data and not self._should_notify(self._mr_key(mr_data), today_iso)]
@@ -4,10 +4,15 @@ import os
 import json
 import time
 import re
+import random
+import shlex
+import shutil
+import platform
+import functools
 import queue
-import multiprocessing
+import threading
+from datetime import date
 import traceback
-from urllib.parse import quote
 import webbrowser
 import subprocess
 import logging
@@ -15,21 +20,112 @@ import logging
 import requests
 import keyring
 
-from PySide6.QtCore import QObject, Signal, Slot, QTimer, Property
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Qt, Signal, Slot, QTimer, Property
 from PySide6.QtGui import QClipboard
 from PySide6.QtWidgets import QApplication
 
 from src.mr_model import MRModel
 from src.mr_notifier import MRNotifier
+from src.id_cache import get_or_fetch_current_user, get_or_fetch_project_id
 from src.gitlab_api import (
-    make_gitlab_request,
+    USE_GRAPHQL,
+    close_session,
+    end_poll_cycle,
+    get_all_mr_data_graphql,
+    get_all_user_merge_requests,
     get_merge_requests,
-    get_pipeline_status,
-    get_approval_status,
-    get_merge_status,
-    get_unresolved_threads_count
+    refresh_all,
+    request_count,
+    shutdown_executor,
+    start_poll_cycle,
+    suggested_delay
 )
 
+VISIBLE_REFRESH_MS = 30000
+HIDDEN_REFRESH_MS = 60000
+IDLE_REFRESH_MAX_MS = 300000
+RATE_LIMIT_MAX_MS = 300000
+REFRESH_JITTER = 0.2
+
+_PIPELINE_PILLS = {
+    'failed': ('Pipeline', '#F44336'),
+    'running': ('Pipeline', '#2196F3'),
+    'pending': ('Pipeline', '#2196F3'),
+    'created': ('Pipeline', '#2196F3'),
+    'canceled': ('Cancelled', '#FF9800'),
+    'cancelled': ('Cancelled', '#FF9800'),
+    'skipped': ('Skipped', '#9E9E9E')
+}
+
+# pills without a per-mr url are shared by every row and must never be mutated;
+# plain dicts rather than mapping proxies so qml still receives them as maps
+_NO_PIPELINE_PILL = {'text': 'No Pipeline', 'color': '#795548', 'url': ''}
+_CONFLICT_PILL = {'text': 'Conflict', 'color': '#FF9800', 'url': ''}
+_APPROVED_PILL = {'text': 'Approved', 'color': '#4CAF50', 'url': ''}
+_COVERAGE_PILL = {'text': 'Coverage', 'color': '#00BCD4', 'url': ''}
+
+# keyed by approved_by_all, approved_except_coverage, needs_coverage_check
+_APPROVAL_PILLS = {
+    (False, False, False): (),
+    (False, False, True): (_COVERAGE_PILL,),
+    (False, True, False): (_APPROVED_PILL,),
+    (False, True, True): (_APPROVED_PILL, _COVERAGE_PILL),
+    **{(True, except_coverage, coverage): (_APPROVED_PILL,)
+       for except_coverage in (False, True) for coverage in (False, True)}
+}
+
+_GITLAB_URL_RE = re.compile(r'(?:git@gitlab\.com:|https://gitlab\.com/)([^/]+)/([^.]+?)(?:\.git)?/?$')
+
+logger = logging.getLogger(__name__)
+
+_SYSTEM = platform.system()
+
+# terminal emulators tried in order on linux, with the flag that runs a command
+_LINUX_TERMINALS = (
+    ('gnome-terminal', '--'),
+    ('konsole', '-e'),
+    ('xterm', '-e')
+)
+
+# the only mr fields the ui and the notifier read
+_MR_FIELDS = ('iid', 'title', 'web_url', 'source_branch', 'sha')
+
+# ##################################################################
+# find terminal
+# probes the path once for the first available terminal emulator
+# returning its command prefix, or none when there is no terminal to use
+@functools.lru_cache(maxsize=None)
+def _find_terminal():
+    if _SYSTEM == "Linux":
+        for terminal, run_flag in _LINUX_TERMINALS:
+            if shutil.which(terminal):
+                return (terminal, run_flag)
+    elif _SYSTEM == "Windows":
+        if shutil.which("wt"):
+            return ("wt", "cmd", "/k")
+        return ("cmd", "/c", "start", "cmd", "/k")
+    return None
+
+# ##################################################################
+# background job signals
+# carries a background job's result back to the gui thread
+class _BackgroundJobSignals(QObject):
+    finished = Signal(object)
+
+# ##################################################################
+# background job
+# runs a blocking call on a qt thread pool so network and disk io
+# never stalls qml repaint, reporting the result through a queued signal
+class _BackgroundJob(QRunnable):
+    def __init__(self, fn, args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = _BackgroundJobSignals()
+
+    def run(self):
+        self.signals.finished.emit(self.fn(*self.args))
+
 # ##################################################################
 # mr status controller
 # coordinates fetching merge request data from gitlab, updating
@@ -37,21 +133,32 @@ from src.gitlab_api import (
 class MRStatusController(QObject):
     statusChanged = Signal(str)
     loadingChanged = Signal(bool)
+    _resultsReady = Signal()
 
     def __init__(self, logger):
         super().__init__()
         self.logger = logger
         self.repositories = []
+        self._repos_by_name = {}
         self.token = None
         self.user_id = None
         self.mr_model = MRModel()
         self._loading = True
         self._repos_loaded = set()
+        self._notified = set()
         self.notifier = None
         self.temp_status = None
+        self._visible = True
+        self._app_state = Qt.ApplicationActive
+        self._rate_limit_ms = 0
+        self._idle_refresh_ms = VISIBLE_REFRESH_MS
+        self._cycle_changed = False
+        self._jobs = set()
+        self._notification_pool = QThreadPool()
+        self._notification_pool.setMaxThreadCount(1)
 
         self._initialize_notifier()
-        self._initialize_multiprocessing()
+        self._initialize_worker_queues()
         self._initialize_timers()
 
         self.loadingChanged.emit(True)
@@ -68,24 +175,24 @@ class MRStatusController(QObject):
             self.logger.warning(f"Could not initialize MR notifier: {e}")
 
     # ##################################################################
-    # initialize multiprocessing
-    # creates queues and prepares worker process for background fetching
-    def _initialize_multiprocessing(self):
-        self.repo_queue = multiprocessing.Queue()
-        self.result_queue = multiprocessing.Queue()
-        self.worker_process = None
+    # initialize worker queues
+    # creates the repo and result queues for the background worker thread
+    # waking the ui thread only when the worker has posted results
+    def _initialize_worker_queues(self):
+        self.repo_queue = queue.Queue()
+        self.result_queue = queue.Queue()
+        self.worker_thread = None
+
+        self._resultsReady.connect(self.check_results, Qt.QueuedConnection)
 
     # ##################################################################
     # initialize timers
-    # sets up periodic refresh, result checking, and status clearing
+    # sets up periodic refresh and status clearing
     def _initialize_timers(self):
-        self.result_timer = QTimer()
-        self.result_timer.timeout.connect(self.check_results)
-        self.result_timer.start(100)
-
         self.refresh_timer = QTimer()
         self.refresh_timer.timeout.connect(self.schedule_refresh)
-        self.refresh_timer.start(30000)
+        self.refresh_timer.start(VISIBLE_REFRESH_MS)
+        self._refresh_base_ms = VISIBLE_REFRESH_MS
 
         self.status_clear_timer = QTimer()
         self.status_clear_timer.setSingleShot(True)
@@ -99,6 +206,53 @@ class MRStatusController(QObject):
     def model(self):
         return self.mr_model
 
+    # ##################################################################
+    # polling active
+    # reports whether fresh data has a consumer, i.e. the window is shown
+    def _polling_active(self):
+        return self._visible and self._app_state != Qt.ApplicationHidden
+
+    # ##################################################################
+    # update refresh interval
+    # polls at full cadence while visible, slows down when hidden and
+    # stops entirely while the application is suspended, never polling
+    # faster than the idle backoff or the gitlab rate limit allows and
+    # jittering each cycle so repeated polls do not line up into bursts
+    # a running countdown is left alone unless its interval changed or a
+    # restart is asked for, so focus changes cannot postpone polling
+    def _update_refresh_interval(self, restart=False):
+        if self._app_state == Qt.ApplicationSuspended:
+            self.refresh_timer.stop()
+            return
+
+        interval = VISIBLE_REFRESH_MS if self._polling_active() else HIDDEN_REFRESH_MS
+        interval = max(interval, self._idle_refresh_ms, self._rate_limit_ms)
+        if not restart and interval == self._refresh_base_ms and self.refresh_timer.isActive():
+            return
+
+        self._refresh_base_ms = interval
+        self.refresh_timer.start(int(interval * random.uniform(1 - REFRESH_JITTER, 1 + REFRESH_JITTER)))
+
+    # ##################################################################
+    # set visible
+    # tracks window visibility and refreshes immediately when reshown
+    def set_visible(self, visible):
+        was_active = self._polling_active()
+        self._visible = visible
+        self._update_refresh_interval()
+        if self._polling_active() and not was_active:
+            self.schedule_refresh()
+
+    # ##################################################################
+    # set application state
+    # tracks qt application state to pause polling while suspended
+    def set_application_state(self, state):
+        was_active = self._polling_active() and self._app_state != Qt.ApplicationSuspended
+        self._app_state = state
+        self._update_refresh_interval()
+        if self._polling_active() and state != Qt.ApplicationSuspended and not was_active:
+            self.schedule_refresh()
+
     # ##################################################################
     # set temporary status
     # displays a status message that automatically clears after duration
@@ -112,15 +266,12 @@ class MRStatusController(QObject):
     # restores the normal status display after temporary message expires
     def clear_temporary_status(self):
         self.temp_status = None
-        total_mrs = self.mr_model.rowCount()
-        if total_mrs == 0:
-            self.statusChanged.emit("No open merge requests")
-        else:
-            self.statusChanged.emit(f"Last updated: {time.strftime('%H:%M:%S')} ({total_mrs} MRs)")
+        self._show_last_updated_status()
 
     # ##################################################################
     # load config
-    # reads repository configuration from json file
+    # reads repository configuration from json file and indexes it by
+    # name; later lookups fill in the same dicts so the index stays current
     def load_config(self, config_path):
         try:
             with open(config_path, 'r') as f:
@@ -136,22 +287,16 @@ class MRStatusController(QObject):
             self.logger.error(f"Error loading config: {e}")
             self.repositories = []
 
+        self._repos_by_name = {repo['name']: repo for repo in self.repositories}
+
     # ##################################################################
     # parse gitlab url
     # extracts owner and repository name from gitlab remote url
     def parse_gitlab_url(self, remote_url):
-        if not re.search(r'(git@gitlab\.com:|https://gitlab\.com/)', remote_url):
-            return None, None
-
-        ssh_match = re.search(r'git@gitlab\.com:([^/]+)/([^\.]+)(\.git)?$', remote_url)
-        https_match = re.search(r'https://gitlab\.com/([^/]+)/([^\.]+)(\.git)?', remote_url)
-
-        if ssh_match:
-            return ssh_match.group(1), ssh_match.group(2)
-        elif https_match:
-            return https_match.group(1), https_match.group(2)
-        else:
-            return None, None
+        match = _GITLAB_URL_RE.search(remote_url)
+        if match:
+            return match.group(1), match.group(2)
+        return None, None
 
     # ##################################################################
     # get gitlab token
@@ -165,21 +310,16 @@ class MRStatusController(QObject):
     # ##################################################################
     # get current user
     # fetches authenticated user information from gitlab api
+    # reusing the user cached on disk from a previous launch
     def get_current_user(self, token):
-        headers = {'PRIVATE-TOKEN': token}
-        return make_gitlab_request('https://gitlab.com/api/v4/user', headers)
+        return get_or_fetch_current_user(token)
 
     # ##################################################################
     # get project id
     # looks up gitlab project id by owner and repository name
+    # reusing the id cached on disk from a previous launch
     def get_project_id(self, owner, repo, token):
-        headers = {'PRIVATE-TOKEN': token}
-        project_path = quote(f"{owner}/{repo}", safe='')
-        project_data = make_gitlab_request(f'https://gitlab.com/api/v4/projects/{project_path}', headers)
-
-        if project_data is not None:
-            return project_data['id']
-        return None
+        return get_or_fetch_project_id(owner, repo, token)
 
     # ##################################################################
     # initialize data
@@ -202,7 +342,55 @@ class MRStatusController(QObject):
             return
 
         self.statusChanged.emit("Authenticating with GitLab...")
-        user = self.get_current_user(self.token)
+        repo_urls = [repo_config['url'] for repo_config in self.repositories]
+        self._run_in_background(QThreadPool.globalInstance(), self._lookup_gitlab_ids,
+                                (self.token, repo_urls), self._on_gitlab_ids_loaded)
+
+    # ##################################################################
+    # run in background
+    # submits a blocking call to a thread pool, delivering its result to
+    # the optional callback on the gui thread once it completes
+    def _run_in_background(self, pool, fn, args, on_finished=None):
+        job = _BackgroundJob(fn, args)
+        self._jobs.add(job)
+        job.signals.finished.connect(lambda result: self._on_job_finished(job, result, on_finished))
+        pool.start(job)
+
+    # ##################################################################
+    # on job finished
+    # releases a completed background job and hands its result on
+    def _on_job_finished(self, job, result, on_finished):
+        self._jobs.discard(job)
+        if on_finished:
+            on_finished(result)
+
+    # ##################################################################
+    # lookup gitlab ids
+    # authenticates and resolves project ids for each repository url
+    # runs on a pool thread so it must not touch controller state
+    def _lookup_gitlab_ids(self, token, repo_urls):
+        try:
+            user = self.get_current_user(token)
+            if not user:
+                return None, {}
+
+            projects = {}
+            for repo_url in repo_urls:
+                owner, repo = self.parse_gitlab_url(repo_url)
+                if owner and repo:
+                    project_id = self.get_project_id(owner, repo, token)
+                    if project_id:
+                        projects[repo_url] = (owner, repo, project_id)
+            return user, projects
+        except Exception as e:
+            self.logger.error(f"Error looking up GitLab ids: {e}")
+            return None, {}
+
+    # ##################################################################
+    # on gitlab ids loaded
+    # applies the resolved user and project ids and starts fetching
+    def _on_gitlab_ids_loaded(self, result):
+        user, projects = result
         if not user:
             self.statusChanged.emit("Could not authenticate with GitLab")
             self._loading = False
@@ -213,69 +401,111 @@ class MRStatusController(QObject):
 
         self.statusChanged.emit("Loading repository information...")
         for repo_config in self.repositories:
-            owner, repo = self.parse_gitlab_url(repo_config['url'])
-            if owner and repo:
-                project_id = self.get_project_id(owner, repo, self.token)
-                if project_id:
-                    repo_config['owner'] = owner
-                    repo_config['repo'] = repo
-                    repo_config['project_id'] = project_id
+            if repo_config['url'] in projects:
+                owner, repo, project_id = projects[repo_config['url']]
+                repo_config['owner'] = owner
+                repo_config['repo'] = repo
+                repo_config['project_id'] = project_id
 
         self.statusChanged.emit("Fetching merge requests...")
         self.start_background_fetch()
 
     # ##################################################################
     # start background fetch
-    # launches worker process for concurrent mr data retrieval
+    # launches worker thread for concurrent mr data retrieval
     def start_background_fetch(self):
-        self.worker_process = multiprocessing.Process(
+        self.worker_thread = threading.Thread(
             target=fetch_mr_data_worker,
-            args=(self.repo_queue, self.result_queue, self.token, self.user_id)
+            args=(self.repo_queue, self.result_queue, self.token, self.user_id, self._resultsReady.emit),
+            daemon=True
         )
-        self.worker_process.start()
+        self.worker_thread.start()
         self.queue_refresh()
 
     # ##################################################################
     # queue refresh
-    # adds all configured repositories to the fetch queue
+    # adds all configured repositories to the fetch queue as one batch
     def queue_refresh(self):
-        for repo_config in self.repositories:
-            if 'project_id' in repo_config:
-                self.repo_queue.put(repo_config)
+        repo_configs = [repo_config for repo_config in self.repositories if 'project_id' in repo_config]
+        if repo_configs:
+            self.repo_queue.put(repo_configs)
 
     # ##################################################################
     # schedule refresh
     # triggers periodic background refresh of all repositories
     def schedule_refresh(self):
         self.queue_refresh()
+        self._update_refresh_interval(restart=True)
 
     # ##################################################################
     # check results
-    # processes completed mr data from the background worker
+    # processes completed mr data from the background worker, draining
+    # the result queue whenever the worker signals new results
+    # and applying every repo received in one go; this is the only
+    # consumer, so empty() is exact and no queue.Empty is ever raised
     def check_results(self):
+        pending = {}
+        cycle_complete = False
         try:
-            while True:
-                try:
-                    message_type, data1, data2 = self.result_queue.get_nowait()
-
-                    if message_type == 'repo_complete':
-                        repo_name, repo_mrs = data1, data2
-                        self.update_repo_data(repo_name, repo_mrs)
-                    elif message_type == 'error':
-                        self.logger.error(f"Worker error: {data1}")
+            while not self.result_queue.empty():
+                message_type, data1, data2 = self.result_queue.get_nowait()
+
+                if message_type == 'repo_complete':
+                    repo_name, repo_mrs = data1, data2
+                    pending[repo_name] = repo_mrs
+                elif message_type == 'rate_limit':
+                    self._rate_limit_ms = min(int(1000 * data1), RATE_LIMIT_MAX_MS)
+                    cycle_complete = True
+                elif message_type == 'error':
+                    self.logger.error(f"Worker error: {data1}")
 
-                except queue.Empty:
-                    break
         except:
             pass
 
+        if pending:
+            self.update_repos_data(pending)
+
+        if cycle_complete:
+            self._apply_idle_backoff()
+
+    # ##################################################################
+    # apply idle backoff
+    # doubles the refresh interval after a cycle that changed no rows, up
+    # to a cap, and snaps back to the normal cadence as soon as one does
+    def _apply_idle_backoff(self):
+        if self._cycle_changed:
+            was_backed_off = self._idle_refresh_ms > VISIBLE_REFRESH_MS
+            self._idle_refresh_ms = VISIBLE_REFRESH_MS
+            if was_backed_off:
+                self._update_refresh_interval()
+        else:
+            self._idle_refresh_ms = min(self._idle_refresh_ms * 2, IDLE_REFRESH_MAX_MS)
+        self._cycle_changed = False
+
     # ##################################################################
-    # update repo data
-    # updates ui model and checks for notification triggers
-    def update_repo_data(self, repo_name, repo_mrs):
-        self._repos_loaded.add(repo_name)
-        self.check_for_notifications(repo_name, repo_mrs)
+    # update repos data
+    # updates ui model for every repo in one pass and checks for
+    # notification triggers, refreshing the status line once at the end
+    def update_repos_data(self, repos_mrs):
+        self._repos_loaded.update(repos_mrs)
+        self.check_for_notifications(repos_mrs)
 
+        if self.mr_model.bulk_update({repo_name: self._build_repo_items(repo_name, repo_mrs)
+                                      for repo_name, repo_mrs in repos_mrs.items()}):
+            self._cycle_changed = True
+
+        expected_repos = {repo['name'] for repo in self.repositories if 'project_id' in repo}
+        if self._repos_loaded >= expected_repos and self._loading:
+            self._loading = False
+            self.loadingChanged.emit(False)
+
+        if not self.temp_status:
+            self._show_last_updated_status()
+
+    # ##################################################################
+    # build repo items
+    # converts worker results for one repo into model rows
+    def _build_repo_items(self, repo_name, repo_mrs):
         new_items = []
         for mr_data in repo_mrs:
             mr = mr_data['mr']
@@ -302,40 +532,33 @@ class MRStatusController(QObject):
                 'pipeline_url': pipeline_url,
                 'branch': mr['source_branch']
             })
+        return new_items
 
-        self.mr_model.update_repo_data(repo_name, new_items)
-
-        expected_repos = {repo['name'] for repo in self.repositories if 'project_id' in repo}
-        if self._repos_loaded >= expected_repos and self._loading:
-            self._loading = False
-            self.loadingChanged.emit(False)
-
-        if not self.temp_status:
-            total_mrs = self.mr_model.rowCount()
-            if total_mrs == 0:
-                self.statusChanged.emit("No open merge requests")
-            else:
-                self.statusChanged.emit(f"Last updated: {time.strftime('%H:%M:%S')} ({total_mrs} MRs)")
+    # ##################################################################
+    # show last updated status
+    # displays the mr count and time of the latest refresh
+    def _show_last_updated_status(self):
+        total_mrs = self.mr_model.rowCount()
+        if total_mrs == 0:
+            self.statusChanged.emit("No open merge requests")
+        else:
+            self.statusChanged.emit(f"Last updated: {time.strftime('%H:%M:%S')} ({total_mrs} MRs)")
 
     # ##################################################################
     # build status pills
     # creates colored status indicators for pipeline, conflicts, threads, and approvals
+    # looking pipeline and approval pills up in precomputed tables
     def _build_status_pills(self, pipeline_status, pipeline_url, merge_status, unresolved_threads, approval_status):
         status_pills = []
 
-        if pipeline_status == 'failed':
-            status_pills.append({'text': 'Pipeline', 'color': '#F44336', 'url': pipeline_url})
-        elif pipeline_status in ['running', 'pending', 'created']:
-            status_pills.append({'text': 'Pipeline', 'color': '#2196F3', 'url': pipeline_url})
-        elif pipeline_status in ['canceled', 'cancelled']:
-            status_pills.append({'text': 'Cancelled', 'color': '#FF9800', 'url': pipeline_url})
-        elif pipeline_status == 'skipped':
-            status_pills.append({'text': 'Skipped', 'color': '#9E9E9E', 'url': pipeline_url})
-        elif pipeline_status is None:
-            status_pills.append({'text': 'No Pipeline', 'color': '#795548', 'url': ''})
+        if pipeline_status is None:
+            status_pills.append(_NO_PIPELINE_PILL)
+        elif pipeline_status in _PIPELINE_PILLS:
+            text, color = _PIPELINE_PILLS[pipeline_status]
+            status_pills.append({'text': text, 'color': color, 'url': pipeline_url})
 
         if merge_status == 'CONFLICT':
-            status_pills.append({'text': 'Conflict', 'color': '#FF9800', 'url': ''})
+            status_pills.append(_CONFLICT_PILL)
 
         if unresolved_threads > 0:
             status_pills.append({
@@ -344,38 +567,62 @@ class MRStatusController(QObject):
                 'url': ''
             })
 
-        if approval_status['approved_by_all']:
-            status_pills.append({'text': 'Approved', 'color': '#4CAF50', 'url': ''})
-        elif approval_status['approved_except_coverage']:
-            status_pills.append({'text': 'Approved', 'color': '#4CAF50', 'url': ''})
-            if approval_status['needs_coverage_check']:
-                status_pills.append({'text': 'Coverage', 'color': '#00BCD4', 'url': ''})
-        elif approval_status['needs_coverage_check'] and not approval_status['approved_except_coverage']:
-            status_pills.append({'text': 'Coverage', 'color': '#00BCD4', 'url': ''})
+        approval_key = (bool(approval_status['approved_by_all']),
+                        bool(approval_status['approved_except_coverage']),
+                        bool(approval_status['needs_coverage_check']))
+        status_pills.extend(_APPROVAL_PILLS[approval_key])
 
         return status_pills
 
     # ##################################################################
     # check for notifications
     # determines if slack notifications should be sent for passing mrs
-    def check_for_notifications(self, repo_name, repo_mrs):
-        self.logger.info(f"NOTIFICATION CHECK: {repo_name} with {len(repo_mrs)} MRs")
-
+    # and sends every repo's mrs as one batch from a single background
+    # thread to keep the ui responsive
+    def check_for_notifications(self, repos_mrs):
         if not self.notifier:
-            self.logger.info("No notifier available - skipping notifications")
+            self.logger.debug("No notifier available - skipping notifications")
             return
 
+        today_iso = date.today().isoformat()
+        notifications = []
+        for repo_name, repo_mrs in repos_mrs.items():
+            notifications.extend(self._collect_notifications(repo_name, repo_mrs, today_iso))
+
+        if notifications:
+            self._run_in_background(self._notification_pool, self._send_notifications,
+                                    (notifications, today_iso), self._notified.update)
+
+    # ##################################################################
+    # notification key
+    # identifies one revision of an mr on one day so it is handed to the
+    # notifier once a day until it changes, disappears, or stops passing,
+    # matching the notifier's daily reminder
+    @staticmethod
+    def _notification_key(project_id, mr_data, today_iso):
+        mr = mr_data.get('mr', {})
+        return (project_id, mr.get('iid'), mr.get('sha'), today_iso)
+
+    # ##################################################################
+    # collect notifications
+    # picks the mrs of one repo whose pipeline passed without conflicts
+    # and which have not already been handed to the notifier
+    def _collect_notifications(self, repo_name, repo_mrs, today_iso):
+        self.logger.debug("NOTIFICATION CHECK: %s with %d MRs", repo_name, len(repo_mrs))
+
         try:
-            project_id = None
-            for repo_config in self.repositories:
-                if repo_config.get('name') == repo_name:
-                    project_id = repo_config.get('project_id')
-                    break
+            repo_config = self._repos_by_name.get(repo_name)
+            project_id = repo_config.get('project_id') if repo_config else None
 
             if not project_id:
                 self.logger.warning(f"No project_id found for {repo_name} - skipping notifications")
-                return
+                return []
 
+            passing = {self._notification_key(project_id, mr_data, today_iso) for mr_data in repo_mrs
+                       if mr_data.get('pipeline_status') == 'success'}
+            self._notified = {key for key in self._notified if key[0] != project_id or key in passing}
+
+            notifications = []
             for mr_data in repo_mrs:
                 pipeline_status = mr_data.get('pipeline_status')
                 merge_status = mr_data.get('merge_status')
@@ -386,14 +633,31 @@ class MRStatusController(QObject):
                 if merge_status == 'CONFLICT':
                     continue
 
+                if self._notification_key(project_id, mr_data, today_iso) in self._notified:
+                    continue
+
                 notification_data = mr_data.copy()
                 notification_data['project_id'] = project_id
+                notifications.append(notification_data)
 
-                self.notifier.process_mr_for_notification(notification_data)
+            return notifications
 
         except Exception as e:
             self.logger.error(f"ERROR checking notifications for {repo_name}: {e}")
             self.logger.error(f"Traceback: {traceback.format_exc()}")
+            return []
+
+    # ##################################################################
+    # send notifications
+    # hands eligible mrs to the notifier on the notification pool thread
+    # returning the keys of the mrs it reports as notified for today
+    def _send_notifications(self, notifications, today_iso):
+        try:
+            notified = self.notifier.process_mr_list(notifications)
+        except Exception as e:
+            self.logger.error(f"ERROR sending notifications: {e}")
+            return set()
+        return {self._notification_key(n['project_id'], n, today_iso) for n in notified}
 
     @Slot(str)
     def openUrl(self, url):
@@ -405,47 +669,29 @@ class MRStatusController(QObject):
         if not mr_url:
             return
 
-        import platform
-        import shutil
-
-        fix_mr_command = f"fix-mr {mr_url}"
+        fix_mr_command = f"fix-mr {shlex.quote(mr_url)}"
 
         try:
-            system = platform.system()
-
-            if system == "Darwin":
+            if _SYSTEM == "Darwin":
                 apple_script = f'''
                 tell application "Terminal"
                     activate
-                    do script "{fix_mr_command}"
+                    do script {json.dumps(fix_mr_command, ensure_ascii=False)}
                 end tell
                 '''
                 subprocess.run(["osascript", "-e", apple_script])
                 self.logger.info(f"Launched fix-mr in Terminal for: {mr_url}")
 
-            elif system == "Linux":
-                terminals = [
-                    ["gnome-terminal", "--", "bash", "-c", f"{fix_mr_command}; read -p 'Press enter to close'"],
-                    ["konsole", "-e", "bash", "-c", f"{fix_mr_command}; read -p 'Press enter to close'"],
-                    ["xterm", "-e", "bash", "-c", f"{fix_mr_command}; read -p 'Press enter to close'"],
-                ]
-
-                launched = False
-                for terminal_cmd in terminals:
-                    if shutil.which(terminal_cmd[0]):
-                        subprocess.Popen(terminal_cmd)
-                        self.logger.info(f"Launched fix-mr in {terminal_cmd[0]} for: {mr_url}")
-                        launched = True
-                        break
-
-                if not launched:
+            elif _SYSTEM == "Linux":
+                terminal_cmd = _find_terminal()
+                if terminal_cmd:
+                    subprocess.Popen([*terminal_cmd, "bash", "-c", f"{fix_mr_command}; read -p 'Press enter to close'"])
+                    self.logger.info(f"Launched fix-mr in {terminal_cmd[0]} for: {mr_url}")
+                else:
                     self.logger.error("Could not find a suitable terminal emulator on Linux")
 
-            elif system == "Windows":
-                if shutil.which("wt"):
-                    subprocess.Popen(["wt", "cmd", "/k", fix_mr_command])
-                else:
-                    subprocess.Popen(["cmd", "/c", "start", "cmd", "/k", fix_mr_command])
+            elif _SYSTEM == "Windows":
+                subprocess.Popen([*_find_terminal(), "fix-mr", mr_url])
                 self.logger.info(f"Launched fix-mr in Windows terminal for: {mr_url}")
 
         except Exception as e:
@@ -475,11 +721,7 @@ class MRStatusController(QObject):
     # performs git checkout operation in a background thread
     def _do_checkout_branch(self, repo_name, branch_name):
         try:
-            repo_config = None
-            for repo in self.repositories:
-                if repo['name'] == repo_name:
-                    repo_config = repo
-                    break
+            repo_config = self._repos_by_name.get(repo_name)
 
             if not repo_config or 'local_path' not in repo_config:
                 self.set_temporary_status(f"No local path configured for {repo_name}")
@@ -492,7 +734,7 @@ class MRStatusController(QObject):
                 return
 
             result = subprocess.run(
-                ['git', 'status', '--porcelain'],
+                ['git', 'status', '--porcelain=v1', '-uno', '-z'],
                 cwd=repo_path,
                 capture_output=True,
                 text=True,
@@ -504,18 +746,22 @@ class MRStatusController(QObject):
                 self.set_temporary_status(f"Failed to checkout {branch_name} in {repo_name} because {error_msg}")
                 return
 
-            if result.stdout.strip():
-                subprocess.run(['git', 'checkout', '--', 'package.json'], cwd=repo_path, capture_output=True, timeout=5)
-                subprocess.run(['git', 'checkout', '--', 'package-lock.json'], cwd=repo_path, capture_output=True, timeout=5)
+            dirty_paths = _dirty_paths(result.stdout)
+            reset_paths = [path for path in ('package.json', 'package-lock.json')
+                           if dirty_paths.get(path, '').startswith(' ')]
+            if reset_paths:
+                reset_result = subprocess.run(['git', 'checkout', '--', *reset_paths],
+                                              cwd=repo_path, capture_output=True, text=True, timeout=5)
 
-                result = subprocess.run(['git', 'status', '--porcelain'], cwd=repo_path, capture_output=True, text=True, timeout=5)
-
-                if result.returncode != 0:
-                    error_msg = result.stderr.strip() or "git status failed"
+                if reset_result.returncode != 0:
+                    error_msg = reset_result.stderr.strip() or "reset failed"
                     self.set_temporary_status(f"Failed to checkout {branch_name} in {repo_name} because {error_msg}")
                     return
 
-            if result.stdout.strip():
+                for path in reset_paths:
+                    del dirty_paths[path]
+
+            if dirty_paths:
                 self.set_temporary_status(f"Can't checkout because {repo_name} isn't clean")
                 return
 
@@ -552,68 +798,103 @@ class MRStatusController(QObject):
 
     # ##################################################################
     # cleanup
-    # terminates background worker process and releases resources
+    # stops background worker thread and releases resources
+    # the thread is a daemon so a request still in flight cannot block exit
     def cleanup(self):
-        if self.worker_process and self.worker_process.is_alive():
+        if self.worker_thread and self.worker_thread.is_alive():
             self.repo_queue.put(None)
-            self.worker_process.join(timeout=1)
-            if self.worker_process.is_alive():
-                self.worker_process.terminate()
+            self.worker_thread.join(timeout=1)
+        if self.notifier:
+            self.notifier.close()
+        close_session()
 
 
 # ##################################################################
 # fetch mr data worker
-# background process that retrieves mr information from gitlab api
-def fetch_mr_data_worker(repo_queue, result_queue, token, user_id):
-    while True:
-        try:
-            repo_config = repo_queue.get(timeout=1)
-            if repo_config is None:
-                break
-
-            mrs = get_merge_requests(repo_config['project_id'], user_id, token)
-
-            repo_mrs = []
-            for mr in mrs:
-                pipeline_status, pipeline_url, debug_info = get_pipeline_status(
-                    repo_config['project_id'],
-                    mr['sha'],
-                    token,
-                    mr['iid']
-                )
-
-                approval_status = get_approval_status(
-                    repo_config['project_id'],
-                    mr['iid'],
-                    token
-                )
-
-                merge_status = get_merge_status(
-                    repo_config['project_id'],
-                    mr['iid'],
-                    token
-                )
-
-                unresolved_threads = get_unresolved_threads_count(
-                    repo_config['project_id'],
-                    mr['iid'],
-                    token
-                )
-
-                repo_mrs.append({
-                    'repo_name': repo_config['name'],
-                    'mr': mr,
-                    'pipeline_status': pipeline_status,
-                    'pipeline_url': pipeline_url,
-                    'approval_status': approval_status,
-                    'merge_status': merge_status,
-                    'unresolved_threads': unresolved_threads,
-                    'debug_info': debug_info
-                })
-
-            result_queue.put(('repo_complete', repo_config['name'], repo_mrs))
-
-        except queue.Empty:
+# background thread that retrieves mr information from gitlab api
+# over one pooled session, calling notify after each posted result
+# each refresh is one poll cycle so mr details are fetched once per refresh
+# using one graphql query for listing and status when enabled, else one
+# user-scoped rest listing per refresh with per-project listing as a
+# fallback when the global listing is unavailable
+def fetch_mr_data_worker(repo_queue, result_queue, token, user_id, notify):
+    def publish(message):
+        result_queue.put(message)
+        notify()
+
+    try:
+        while True:
+            try:
+                repo_configs = repo_queue.get(timeout=1)
+                if repo_configs is None:
+                    break
+
+                start_poll_cycle()
+                try:
+                    cycle_start_count = request_count()
+                    statuses_by_project = get_all_mr_data_graphql(token) if USE_GRAPHQL else None
+                    all_mrs = get_all_user_merge_requests(token) if statuses_by_project is None else None
+                    mrs_by_project = {}
+                    if all_mrs is not None:
+                        for mr in all_mrs:
+                            mrs_by_project.setdefault(mr['project_id'], []).append(mr)
+
+                    for repo_config in repo_configs:
+                        project_id = repo_config['project_id']
+                        if statuses_by_project is not None:
+                            mr_statuses = statuses_by_project.get(project_id, [])
+                        elif all_mrs is not None:
+                            mr_statuses = refresh_all(project_id, mrs_by_project.get(project_id, []), token)
+                        else:
+                            mr_statuses = refresh_all(project_id, get_merge_requests(project_id, user_id, token), token)
+
+                        repo_mrs = [_compact_mr_result(repo_config['name'], mr_status) for mr_status in mr_statuses]
+
+                        publish(('repo_complete', repo_config['name'], repo_mrs))
+
+                    publish(('rate_limit', suggested_delay(request_count() - cycle_start_count), None))
+                finally:
+                    end_poll_cycle()
+
+            except queue.Empty:
+                continue
+            except Exception as e:
+                publish(('error', str(e), None))
+    finally:
+        shutdown_executor()
+        close_session()
+
+# ##################################################################
+# compact mr result
+# keeps only the mr fields the ui and notifier read so the model does not
+# hold every gitlab payload, dropping debug info unless debug logging is on
+def _compact_mr_result(repo_name, mr_status):
+    mr = mr_status['mr']
+    result = {
+        'repo_name': repo_name,
+        'mr': {field: mr.get(field) for field in _MR_FIELDS},
+        'pipeline_status': mr_status['pipeline_status'],
+        'pipeline_url': mr_status['pipeline_url'],
+        'approval_status': mr_status['approval_status'],
+        'merge_status': mr_status['merge_status'],
+        'unresolved_threads': mr_status['unresolved_threads']
+    }
+    if logger.isEnabledFor(logging.DEBUG):
+        result['debug_info'] = mr_status.get('debug_info')
+    return result
+
+# ##################################################################
+# dirty paths
+# parses nul separated porcelain v1 status output into a map of changed
+# path to its two letter status, counting both sides of a rename or copy
+def _dirty_paths(status_output):
+    paths = {}
+    entries = iter(status_output.split('\0'))
+    for entry in entries:
+        if not entry:
             continue
-        except Exception as e:
-            result_queue.put(('error', str(e), None))
+        paths[entry[3:]] = entry[:2]
+        if entry[0] in 'RC':
+            paths[next(entries, '')] = entry[:2]
+    paths.pop('', None)
+    return paths